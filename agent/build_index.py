@@ -1,11 +1,12 @@
-import os, glob, logging
+import os, glob, hashlib, logging
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from .config import Settings
 from .logging_conf import setup_logging
-from .pdf_metadata import extract_pdf_metadata
+from .pdf_metadata import extract_pdf_metadata_batch
+from .citation_formatter import CitationFormatter
 
 log = logging.getLogger("build_index")
 
@@ -38,7 +39,9 @@ def build_index(corpus_dir: str = "./corpus"):
        - Memindai semua file PDF dalam `corpus_dir` menggunakan `glob.glob()`.
 
     2. **Ekstraksi metadata dan konten PDF**
-       - Untuk setiap PDF, diekstrak metadata bibliografi (judul, penulis, tahun, DOI, jurnal).
+       - Metadata bibliografi (judul, penulis, tahun, DOI, jurnal) seluruh PDF diekstrak
+         sekaligus melalui `extract_pdf_metadata_batch()` secara paralel antar proses;
+         PDF yang sudah ada di cache metadata tidak di-parse ulang.
        - File PDF kemudian dimuat per halaman menggunakan `PyPDFLoader`, menghasilkan satu
          objek `Document` per halaman.
        - Metadata bibliografi disematkan ke setiap halaman untuk keperluan pelacakan sumber
@@ -86,27 +89,34 @@ def build_index(corpus_dir: str = "./corpus"):
     if not pdfs:
         log.warning("No PDFs found in %s", corpus_dir); return
 
+    # Ekstrak metadata bibliografi seluruh PDF sekaligus (paralel antar proses)
+    all_metadata = extract_pdf_metadata_batch(pdfs)
+
     docs = []
-    for p in pdfs:
+    for p, pdf_metadata in zip(pdfs, all_metadata):
         log.info(f"Processing {os.path.basename(p)}...")
 
-        # Ekstrak metadata bibliografi dari PDF
-        pdf_metadata = extract_pdf_metadata(p)
         log.info(f"  Title: {pdf_metadata.get('title', 'Unknown')}")
         log.info(f"  Authors: {', '.join(pdf_metadata.get('authors', [])) or 'Unknown'}")
         log.info(f"  Year: {pdf_metadata.get('year', 'Unknown')}")
 
+        # Metadata bibliografi sama untuk semua halaman, jadi cukup disusun sekali per PDF
+        authors_list = pdf_metadata.get('authors', [])
+        bib_metadata = {
+            'bib_title': pdf_metadata.get('title'),
+            'bib_authors': "; ".join(authors_list) if authors_list else None,  # Simpan sebagai string
+            'bib_year': pdf_metadata.get('year'),
+            'bib_journal': pdf_metadata.get('journal'),
+            'bib_doi': pdf_metadata.get('doi'),
+        }
+
         # Muat PDF per halaman menggunakan loader LangChain
         for d in PyPDFLoader(p).load():     # one Document per page
             # Tambahkan metadata bibliografi ke setiap halaman
-            authors_list = pdf_metadata.get('authors', [])
-            authors_str = "; ".join(authors_list) if authors_list else None
-
-            d.metadata['bib_title'] = pdf_metadata.get('title')
-            d.metadata['bib_authors'] = authors_str  # Simpan sebagai string
-            d.metadata['bib_year'] = pdf_metadata.get('year')
-            d.metadata['bib_journal'] = pdf_metadata.get('journal')
-            d.metadata['bib_doi'] = pdf_metadata.get('doi')
+            d.metadata.update(bib_metadata)
+            # Sitasi inline disusun sekali saat indexing, bukan pada setiap query
+            d.metadata['citation_inline_ieee'] = CitationFormatter.format_inline_citation_fields(
+                authors_list, bib_metadata['bib_year'], page=d.metadata.get('page'))
             docs.append(d)
 
     # Pecah teks menjadi potongan yang lebih kecil dengan overlap
@@ -114,13 +124,21 @@ def build_index(corpus_dir: str = "./corpus"):
         chunk_size=1000, chunk_overlap=150,
         separators=["\n\n", "\n", ".", " "]
     )
-    chunks = splitter.split_documents(docs)
+    # ID potongan diturunkan dari isinya (sumber, halaman, teks), sehingga
+    # menjalankan ulang build_index menimpa potongan yang sama (upsert)
+    # alih-alih menambah duplikat; potongan identik digabung menjadi satu
+    by_id = {}
+    for c in splitter.split_documents(docs):
+        key = f"{c.metadata.get('source')}\0{c.metadata.get('page')}\0{c.page_content}"
+        by_id.setdefault(hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest(), c)
+    chunks = list(by_id.values())
 
     # Buat embedding menggunakan Google Generative AI (Gemini)
     emb = GoogleGenerativeAIEmbeddings(model=s.embed_model)  # text-embedding-004
-    # Bangun dan simpan Chroma index secara otomatis
-    vs = Chroma.from_documents(chunks, embedding=emb, persist_directory=s.chroma_dir)
-    
+    # Chroma dengan persist_directory menyimpan setiap penulisan secara otomatis;
+    # tidak perlu memanggil persist()
+    Chroma.from_documents(chunks, embedding=emb, ids=list(by_id), persist_directory=s.chroma_dir)
+
     log.info("Built Chroma index at %s with %d chunks", s.chroma_dir, len(chunks))
     return s.chroma_dir
 
@@ -21,6 +21,10 @@ from datetime import datetime
 
 log = logging.getLogger("citation_export")
 
+# Pola blok hasil pencarian: **Judul** / Authors: ... / Year: ....
+# Dikompilasi sekali saat modul dimuat.
+_CITATION_BLOCK = re.compile(r'\*\*(.*?)\*\*\s*\nAuthors?: (.*?)\nYear: (\d{4})?', re.MULTILINE)
+
 
 class Citation:
     """
@@ -483,11 +487,8 @@ class CitationManager:
         citations = []
 
         # Pencarian pola sederhana untuk mengekstrak data kutipan
-        pattern = r'\*\*(.*?)\*\*\s*\nAuthors?: (.*?)\nYear: (\d{4})?'
-        matches = re.findall(pattern, text, re.MULTILINE)
-
-        for match in matches:
-            title, authors, year = match
+        for match in _CITATION_BLOCK.finditer(text):
+            title, authors, year = match.groups('')
             author_list = [a.strip() for a in authors.split(',')]
 
             citation = Citation(
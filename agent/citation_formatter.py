@@ -283,9 +283,27 @@ class CitationFormatter:
         Kutipan ini biasa digunakan dalam teks utama (in-text citation)
         untuk merujuk sumber tanpa menampilkan detail lengkap.
         """
-        authors = metadata.get('authors', [])
-        year = metadata.get('year', 'n.d.')
+        return CitationFormatter.format_inline_citation_fields(
+            metadata.get('authors', []), metadata.get('year', 'n.d.'), page, style)
+
+    @staticmethod
+    def format_inline_citation_fields(authors: List[str], year, page: Optional[int] = None,
+                                      style: str = 'ieee') -> str:
+        """
+        Sama seperti `format_inline_citation`, tetapi menerima penulis dan tahun
+        secara langsung sehingga pemanggil tidak perlu membangun dict metadata.
+
+        ---
+        ### Parameter
+        - **authors** (`List[str]`): Daftar nama penulis.
+        - **year**: Tahun terbit (ditampilkan apa adanya).
+        - **page** (`int`, opsional): Nomor halaman.
+        - **style** (`str`, opsional): Gaya sitasi (`'ieee'`, `'apa'`, `'mla'`, `'chicago'`).
 
+        ---
+        ### Return
+        - **str**: Kutipan pendek, misalnya `(Setiawan, 2025, p. 10)`.
+        """
         if style == 'ieee':
             # IEEE uses numbered references [1], [2], etc.
             # For inline, we'll use author-year for clarity
@@ -374,3 +392,27 @@ def format_citation(metadata: Dict, page: Optional[int] = None, style: str = 'ie
         return formatter.format_inline_citation(metadata, page, style)
     else:
         return formatter.format_citation(metadata, page, style)
+
+
+def format_citation_fields(authors: List[str], title: Optional[str], year, journal: Optional[str],
+                           doi: Optional[str], page: Optional[int] = None, style: str = 'ieee',
+                           inline: bool = True) -> str:
+    """
+    Varian `format_citation` dengan argumen posisional per field.
+
+    ---
+    ### Deskripsi
+    Dipakai pada jalur retrieval yang memformat satu kutipan per dokumen:
+    kutipan inline hanya membutuhkan penulis dan tahun, sehingga dict
+    metadata tidak perlu dibangun untuk setiap dokumen. Dict hanya dibuat
+    untuk kutipan lengkap.
+
+    ---
+    ### Return
+    - **str**: Teks kutipan yang diformat, identik dengan `format_citation`
+      untuk metadata yang sama.
+    """
+    if inline:
+        return CitationFormatter.format_inline_citation_fields(authors, year, page, style)
+    metadata = {'authors': authors, 'title': title, 'year': year, 'journal': journal, 'doi': doi}
+    return CitationFormatter.format_citation(metadata, page, style)
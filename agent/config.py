@@ -7,6 +7,10 @@ class Settings(BaseModel):
     locale: str = os.getenv("APP_LOCALE", "id-ID")
     tz: str = os.getenv("APP_TZ", "Asia/Jakarta")
     chroma_dir: str = os.getenv("CHROMA_DIR", "./store/chroma")
+    llm_cache_dir: str = os.getenv("LLM_CACHE_DIR", "./store/llm_cache")
+    pdf_metadata_cache_dir: str = os.getenv("PDF_METADATA_CACHE_DIR", "./store/pdf_metadata")
+    pdf_backend: str = os.getenv("PDF_BACKEND", "auto")
+    pdf_prewarm: bool = os.getenv("PDF_PREWARM", "0") == "1"
     llm_model: str = os.getenv("LLM_MODEL", "gemini-2.5-flash")
     embed_model: str = os.getenv("EMBED_MODEL", "text-embedding-004")
     top_k: int = int(os.getenv("TOP_K", "6"))
@@ -2,7 +2,8 @@
 Manajer Riwayat Percakapan (Conversation Manager)
 
 Modul ini berfungsi untuk mengelola dan menyimpan riwayat percakapan antar pengguna.
-Setiap percakapan dicatat secara terstruktur dalam format JSON, lengkap dengan
+Setiap percakapan dicatat secara terstruktur dalam format JSON Lines (satu baris
+per percakapan, hanya ditambahkan di akhir file), lengkap dengan
 penanda waktu (timestamp), pertanyaan, jawaban, serta daftar sumber yang digunakan
 selama percakapan.
 
@@ -11,20 +12,45 @@ Dengan adanya modul ini, sistem dapat:
 2. Menyediakan riwayat yang dapat ditinjau ulang atau ditampilkan kembali.
 3. Mengelola pencarian dan penghapusan riwayat dengan mudah.
 """
+import io
+import os
 import json
 import logging
+import re
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
 
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding/decoding
+    orjson = None
+
 log = logging.getLogger("conversation_manager")
 
+# Ukuran blok saat membaca file riwayat dari belakang
+_TAIL_BLOCK_SIZE = 4096
+
+
+def _dumps(obj) -> bytes:
+    """Serialisasi satu entri menjadi satu baris JSON (bytes, tanpa newline)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(line: bytes):
+    """Kebalikan dari _dumps."""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
 
 class ConversationManager:
     """
     Kelas ini bertugas mengelola riwayat percakapan untuk setiap pengguna.
-    Setiap pengguna akan memiliki satu file JSON yang berisi seluruh interaksi
-    yang pernah dilakukan dengan sistem.
+    Setiap pengguna akan memiliki satu file JSON Lines yang berisi seluruh
+    interaksi yang pernah dilakukan dengan sistem, satu percakapan per baris.
 
     Atribut
     -------
@@ -67,11 +93,55 @@ class ConversationManager:
         Mengembalikan
         -------------
         Path
-            Objek Path menuju file JSON pengguna.
+            Objek Path menuju file JSON Lines pengguna.
         """
-        user_file = self.base_dir / f"user_{user_id}.json"
+        user_file = self.base_dir / f"user_{user_id}.jsonl"
+        if not user_file.exists():
+            self._migrate_legacy_file(user_id, user_file)
         return user_file
 
+    def _migrate_legacy_file(self, user_id: str, user_file: Path):
+        """
+        Mengonversi file riwayat format lama (satu dokumen JSON ``user_<id>.json``)
+        menjadi JSON Lines, lalu menghapus file lama.
+        """
+        legacy_file = self.base_dir / f"user_{user_id}.json"
+        if not legacy_file.exists():
+            return
+
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            conversations = json.load(f).get("conversations", [])
+
+        tmp_file = user_file.with_suffix(".jsonl.tmp")
+        with open(tmp_file, 'wb') as f:
+            for conv in conversations:
+                f.write(_dumps(conv) + b"\n")
+        os.replace(tmp_file, user_file)
+        legacy_file.unlink()
+
+        log.info(f"Migrated conversation history for user {user_id} to JSON Lines")
+
+    @staticmethod
+    def _read_last_lines(user_file: Path, limit: int) -> List[bytes]:
+        """
+        Membaca ``limit`` baris terakhir file dengan membaca blok dari akhir file,
+        sehingga biaya tidak bergantung pada panjang seluruh riwayat.
+        """
+        with open(user_file, 'rb') as f:
+            pos = f.seek(0, os.SEEK_END)
+            data = b""
+            # limit baris lengkap butuh limit + 1 pemisah (file diakhiri newline)
+            while pos > 0 and data.count(b"\n") <= limit:
+                size = min(_TAIL_BLOCK_SIZE, pos)
+                pos -= size
+                f.seek(pos)
+                data = f.read(size) + data
+
+        lines = data.splitlines()
+        if pos > 0:
+            lines = lines[1:]  # Baris pertama mungkin terpotong
+        return lines[-limit:]
+
     def add_conversation(self, user_id: str, question: str, answer: str,
                         sources: Optional[List[str]] = None):
         """
@@ -79,13 +149,14 @@ class ConversationManager:
 
         Langkah-langkah
         ---------------
-        1. Memuat riwayat lama dari file (jika ada).
-        2. Membuat entri percakapan baru yang berisi:
+        1. Membuat entri percakapan baru yang berisi:
             - Waktu percakapan (timestamp ISO 8601)
             - Pertanyaan pengguna
             - Jawaban agen
+            - Potongan jawaban singkat (200 dan 150 karakter) untuk konteks dan tampilan
             - Daftar sumber yang digunakan (jika tersedia)
-        3. Menyimpan ulang seluruh riwayat ke dalam file pengguna.
+        2. Menambahkan entri sebagai satu baris di akhir file pengguna
+           (riwayat lama tidak dibaca maupun ditulis ulang).
 
         Parameter
         ---------
@@ -100,25 +171,21 @@ class ConversationManager:
         """
         user_file = self._get_user_file(user_id)
 
-        # Load existing history
-        if user_file.exists():
-            with open(user_file, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-        else:
-            history = {"user_id": user_id, "conversations": []}
-
         # Add new conversation
+        # Short forms of the answer are materialized once here so the
+        # read paths (context building, history display) never re-slice it.
         conversation = {
             "timestamp": datetime.now().isoformat(),
             "question": question,
             "answer": answer,
+            "answer_short_200": answer[:200],
+            "answer_short_150": answer[:150] + "..." if len(answer) > 150 else answer,
             "sources": sources or []
         }
-        history["conversations"].append(conversation)
 
-        # Save
-        with open(user_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2, ensure_ascii=False)
+        # Append
+        with open(user_file, 'ab') as f:
+            f.write(_dumps(conversation) + b"\n")
 
         log.info(f"Saved conversation for user {user_id}")
 
@@ -143,15 +210,13 @@ class ConversationManager:
         if not user_file.exists():
             return []
 
-        with open(user_file, 'r', encoding='utf-8') as f:
-            history = json.load(f)
-
-        conversations = history.get("conversations", [])
-
         if limit:
-            conversations = conversations[-limit:]
+            lines = self._read_last_lines(user_file, limit)
+        else:
+            with open(user_file, 'rb') as f:
+                lines = f.read().splitlines()
 
-        return conversations
+        return [_loads(line) for line in lines if line]
 
     def get_recent_context(self, user_id: str, num_turns: int = 3) -> str:
         """
@@ -179,12 +244,19 @@ class ConversationManager:
         if not history:
             return ""
 
-        context_parts = []
-        for conv in history:
-            context_parts.append(f"Q: {conv['question']}")
-            context_parts.append(f"A: {conv['answer'][:200]}...")  # Truncate long answers
+        # Stream straight into one buffer instead of building a list to join
+        buf = io.StringIO()
+        for i, conv in enumerate(history):
+            if i:
+                buf.write("\n")
+            buf.write(f"Q: {conv['question']}\n")
+            # Truncate long answers (older records lack the precomputed short form)
+            short = conv.get('answer_short_200')
+            if short is None:
+                short = conv['answer'][:200]
+            buf.write(f"A: {short}...")
 
-        return "\n".join(context_parts)
+        return buf.getvalue()
 
     def clear_history(self, user_id: str) -> bool:
         """
@@ -200,7 +272,7 @@ class ConversationManager:
         bool
             True jika penghapusan berhasil, False jika file tidak ditemukan.
         """
-        user_file = self._get_user_file(user_id)
+        user_file = self._get_user_file(user_id)  # Also migrates a legacy file
 
         if user_file.exists():
             user_file.unlink()
@@ -230,28 +302,32 @@ class ConversationManager:
         if not history:
             return "No conversation history found."
 
-        lines = [f"📜 **Your Recent Conversations** (last {len(history)}):\n"]
+        buf = io.StringIO()
+        buf.write(f"📜 **Your Recent Conversations** (last {len(history)}):\n\n")
 
         for i, conv in enumerate(history, 1):
+            if i > 1:
+                buf.write("\n")  # Empty line between conversations
+
             timestamp = datetime.fromisoformat(conv['timestamp'])
             time_str = timestamp.strftime("%Y-%m-%d %H:%M")
 
-            lines.append(f"**{i}. {time_str}**")
-            lines.append(f"❓ Q: {conv['question']}")
+            buf.write(f"**{i}. {time_str}**\n")
+            buf.write(f"❓ Q: {conv['question']}\n")
 
-            # Truncate long answers
-            answer = conv['answer']
-            if len(answer) > 150:
-                answer = answer[:150] + "..."
+            # Truncate long answers (older records lack the precomputed short form)
+            answer = conv.get('answer_short_150')
+            if answer is None:
+                answer = conv['answer']
+                if len(answer) > 150:
+                    answer = answer[:150] + "..."
 
-            lines.append(f"💡 A: {answer}")
+            buf.write(f"💡 A: {answer}\n")
 
             if conv.get('sources'):
-                lines.append(f"📚 Sources: {len(conv['sources'])}")
-
-            lines.append("")  # Empty line
+                buf.write(f"📚 Sources: {len(conv['sources'])}\n")
 
-        return "\n".join(lines)
+        return buf.getvalue()
 
     def get_all_sources(self, user_id: str) -> List[str]:
         """
@@ -293,12 +369,13 @@ class ConversationManager:
         """
         history = self.get_history(user_id)
 
-        query_lower = query.lower()
+        # Compile once and match case-insensitively on the original strings,
+        # so no lowercase copy is allocated per question/answer.
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
         matches = []
 
         for conv in history:
-            if (query_lower in conv['question'].lower() or
-                query_lower in conv['answer'].lower()):
+            if pattern.search(conv['question']) or pattern.search(conv['answer']):
                 matches.append(conv)
 
         return matches
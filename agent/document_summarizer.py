@@ -13,6 +13,42 @@ from .config import Settings
 
 log = logging.getLogger("document_summarizer")
 
+# Prompt templates are parsed once at import and reused for every document
+_OVERVIEW_PROMPT = ChatPromptTemplate.from_template(
+    """You are a research assistant. Read the following text from the beginning of a research paper and provide a brief 2-3 sentence overview of what the paper is about.
+
+TEXT:
+{text}
+
+Provide a clear, concise overview:"""
+)
+
+_FINDINGS_PROMPT = ChatPromptTemplate.from_template(
+    """You are a research assistant. Read the following research paper text and extract 3-5 key findings or main points.
+TEXT:
+{text}
+
+Provide key findings as a bulleted list (use - for bullets):"""
+)
+
+_METHODOLOGY_PROMPT = ChatPromptTemplate.from_template(
+    """You are a research assistant. Read the following text and briefly describe the research methodology used (if any). If no clear methodology is present, say "Not applicable" or "Not a research paper".
+
+TEXT:
+{text}
+
+Methodology (1-2 sentences):"""
+)
+
+_CONCLUSIONS_PROMPT = ChatPromptTemplate.from_template(
+    """You are a research assistant. Read the following text from the end of a paper and summarize the main conclusions in 2-3 sentences.
+
+TEXT:
+{text}
+
+Conclusions:"""
+)
+
 
 class DocumentSummarizer:
     """Generates and manages document summaries."""
@@ -98,17 +134,8 @@ class DocumentSummarizer:
 
     def _generate_overview(self, text: str) -> str:
         """Generate a brief overview from the introduction."""
-        prompt = ChatPromptTemplate.from_template(
-            """You are a research assistant. Read the following text from the beginning of a research paper and provide a brief 2-3 sentence overview of what the paper is about.
-
-TEXT:
-{text}
-
-Provide a clear, concise overview:"""
-        )
-
         try:
-            chain = prompt | self.llm
+            chain = _OVERVIEW_PROMPT | self.llm
             result = chain.invoke({"text": text[:4000]})  # Limit text length
             return result.content.strip()
         except Exception as e:
@@ -117,19 +144,11 @@ Provide a clear, concise overview:"""
 
     def _extract_key_findings(self, text: str) -> List[str]:
         """Extract key findings from the document."""
-        prompt = ChatPromptTemplate.from_template(
-            """You are a research assistant. Read the following research paper text and extract 3-5 key findings or main points.
-TEXT:
-{text}
-
-Provide key findings as a bulleted list (use - for bullets):"""
-        )
-
         try:
             # Sample text if too long
             sample_text = text[:8000] if len(text) > 8000 else text
 
-            chain = prompt | self.llm
+            chain = _FINDINGS_PROMPT | self.llm
             result = chain.invoke({"text": sample_text})
 
             # Parse bullet points
@@ -147,17 +166,8 @@ Provide key findings as a bulleted list (use - for bullets):"""
 
     def _extract_methodology(self, text: str) -> str:
         """Extract methodology description."""
-        prompt = ChatPromptTemplate.from_template(
-            """You are a research assistant. Read the following text and briefly describe the research methodology used (if any). If no clear methodology is present, say "Not applicable" or "Not a research paper".
-
-TEXT:
-{text}
-
-Methodology (1-2 sentences):"""
-        )
-
         try:
-            chain = prompt | self.llm
+            chain = _METHODOLOGY_PROMPT | self.llm
             result = chain.invoke({"text": text[:4000]})
             return result.content.strip()
         except Exception as e:
@@ -166,17 +176,8 @@ Methodology (1-2 sentences):"""
 
     def _extract_conclusions(self, text: str) -> str:
         """Extract conclusions from the document."""
-        prompt = ChatPromptTemplate.from_template(
-            """You are a research assistant. Read the following text from the end of a paper and summarize the main conclusions in 2-3 sentences.
-
-TEXT:
-{text}
-
-Conclusions:"""
-        )
-
         try:
-            chain = prompt | self.llm
+            chain = _CONCLUSIONS_PROMPT | self.llm
             result = chain.invoke({"text": text[:4000]})
             return result.content.strip()
         except Exception as e:
@@ -207,7 +208,7 @@ Conclusions:"""
         summary_file = self._get_summary_file(pdf_filename)
 
         with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
+            json.dump(summary, f, ensure_ascii=False)
 
         log.info(f"Saved summary to: {summary_file}")
 
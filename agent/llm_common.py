@@ -0,0 +1,55 @@
+"""
+Settings, Gemini chat client and summary prompt shared by the retrieval tools.
+"""
+from functools import lru_cache
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.prompts import ChatPromptTemplate
+from .config import Settings
+
+# Parsed once at import; only the question and context vary per call.
+# Fixed instructions come first and the question last, so repeated questions
+# over the same passages share a long prompt prefix for Gemini's implicit
+# prompt caching.
+SUMMARY_PROMPT = ChatPromptTemplate.from_template(
+    """You are a research assistant helping a researcher. Write a concise answer in bullet points.
+Each point MUST be grounded in the CONTEXT provided below.
+
+For EVERY claim, you MUST include an in-text citation in IEEE format using the information from the [Citation: ...] tags.
+
+IEEE In-text Citation Format:
+- Use: (Author(s), Year, p. Page)
+- Example: (Smith, 2020, p. 5)
+- Multiple authors: (Smith et al., 2020, p. 5)
+
+IMPORTANT:
+1. Extract the author name(s), year, and page number from the [Citation: ...] tags in the context
+2. Format each citation exactly as shown in the IEEE format above
+3. Do NOT use generic terms like "context" or "document"
+4. Every factual claim MUST have a citation
+
+If information is missing from the context, state what's missing.
+
+CONTEXT:
+{context}
+
+QUESTION:
+{question}
+""")
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings are read from the environment once per process."""
+    return Settings()
+
+
+@lru_cache(maxsize=4)
+def get_llm(model: str) -> ChatGoogleGenerativeAI:
+    """Reuse one LLM client (and its HTTP connections) per model."""
+    return ChatGoogleGenerativeAI(model=model, temperature=0)
+
+
+@lru_cache(maxsize=4)
+def get_summary_chain(model: str):
+    """Prompt | LLM pipeline for summaries, composed once per model."""
+    return SUMMARY_PROMPT | get_llm(model)
@@ -1,29 +1,211 @@
 """
 Extract bibliographic metadata from PDF documents.
+
+PyMuPDF is used as the PDF backend when it is installed (much faster text
+extraction); otherwise pypdf is used. Set PDF_BACKEND to force one.
 """
+import io
 import os
 import re
+import json
+import hashlib
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from typing import Dict, Optional, List
 from pypdf import PdfReader
+from .config import Settings
+
+try:
+    import pymupdf
+except ImportError:  # Optional faster backend
+    try:
+        import fitz as pymupdf
+    except ImportError:
+        pymupdf = None
 
 log = logging.getLogger("pdf_metadata")
 
+# Precompiled patterns (compiled once at import instead of on every call)
+_RE_AUTHOR_SPLIT = re.compile(r'[;,]|\sand\s|\s&\s|\n')
+# "(email)" or any parenthesised/bracketed affiliation, removed in one pass
+_RE_EMAIL_OR_AFFIL = re.compile(r'\s*\([^)]*@[^)]*\)|\s*[\[\(][^\]\)]*[\]\)]')
+_RE_TRAIL = re.compile(r'[\d\*†‡§¹²³⁴⁵⁶⁷⁸⁹⁰,]+$')
+# Trailing footnote markers or a bare email address anywhere
+_RE_TRAIL_OR_EMAIL = re.compile(r'[\d\*†‡§¹²³⁴⁵⁶⁷⁸⁹⁰]+$|\s*[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_RE_YEAR4 = re.compile(r'(\d{4})')
+_RE_YEARS = re.compile(r'\b(19\d{2}|20\d{2})\b')
+_RE_DOI = re.compile(r'10\.\d{4,}/[^\s]+')
+_RE_ABSTRACT = re.compile(r'abstract[:\s]*\n(.+?)(?:\n\n|\n[A-Z]|\nKeywords:)', re.IGNORECASE | re.DOTALL)
+_RE_JOURNAL_PATTERNS = (
+    re.compile(r'(?:Published in|Journal of|Proceedings of)\s+([^\n]+)'),
+    re.compile(r'([A-Z][a-z]+\s+(?:Journal|Review|Letters|Transactions)(?:\s+(?:of|on|in))?\s+[^\n]+)'),
+)
+_RE_WHITESPACE = re.compile(r'\s+')
+_RE_BYLINE = re.compile(r'^(?:By\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})$')
+_RE_BY_PREFIX = re.compile(r'^By\s+')
+_RE_TITLE_NAME = re.compile(r'^(?:Mrs?\.?|Dr\.?|Prof\.?)[A-Z]')
+_RE_TITLE_NAME_SPACED = re.compile(r'^(?:Mrs?\.?|Dr\.?|Prof\.?)\s*[A-Z]')
+_RE_TITLE_DOT = re.compile(r'(^(?:Mrs?|Dr|Prof))\.([A-Z])')
+# All author-line shapes in one pattern; alternatives are tried in priority
+# order and the matching one is reported through ``match.lastgroup``.
+_RE_NAME_ALL = re.compile(
+    r'^(?:'
+    r'(?P<camel>(?:[A-Z][a-z]+){2,6})'                 # "NadimpalliMadanaKailashVarma"
+    r'|(?P<initial>[A-Z]\.(?:\s*[A-Z][a-z]+){1,3})'     # "G.RishabBabu"
+    r'|(?P<abbrev>[A-Z][a-z]{1,3}\.(?:\s*[A-Z][a-z]+){1,4})'  # "Md.IrfanAhmed"
+    r'|(?P<title>(?:Mrs?\.?|Dr\.?|Prof\.?)[A-Z].*)'     # "Mrs.FatimaUnnisa"
+    r'|(?P<normal>[A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,4})'   # "John Smith"
+    r')$'
+)
+
+# Fields derived from PDF content only; these are what the metadata cache stores
+_CONTENT_FIELDS = ('title', 'authors', 'year', 'journal', 'doi', 'abstract')
+# Part of every metadata cache key. Bump it whenever a change to the
+# extraction heuristics changes their output, so PDFs that were already
+# processed are parsed again instead of keeping their old cached fields.
+_EXTRACTOR_VERSION = 1
+# Bytes read from each end of the file to fingerprint it
+_FINGERPRINT_BYTES = 64 * 1024
+# Stop first-page text extraction after this many characters. Every helper
+# only looks at the first ~60 lines / 1000 chars, except the DOI and abstract
+# searches, so the budget is generous enough to still cover a full page.
+_FIRST_PAGE_CHAR_BUDGET = 8192
+
+# Filename separators mapped to spaces for the fallback title
+_FILENAME_SEPARATORS = str.maketrans('_-', '  ')
+
+# One-page PDF containing the word "warm", parsed to warm up the backend
+_WARMUP_PDF = (
+    b'%PDF-1.4\n1 0 obj\n<</Type/Catalog/Pages 2 0 R>>\nendobj\n'
+    b'2 0 obj\n<</Type/Pages/Kids[3 0 R]/Count 1>>\nendobj\n'
+    b'3 0 obj\n<</Type/Page/Parent 2 0 R/MediaBox[0 0 72 72]'
+    b'/Resources<</Font<</F1 4 0 R>>>>/Contents 5 0 R>>\nendobj\n'
+    b'4 0 obj\n<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>\nendobj\n'
+    b'5 0 obj\n<</Length 32>>stream\nBT /F1 8 Tf 4 30 Td (warm) Tj ET\nendstream\nendobj\n'
+    b'xref\n0 6\n0000000000 65535 f \n0000000009 00000 n \n0000000054 00000 n \n'
+    b'0000000105 00000 n \n0000000215 00000 n \n0000000278 00000 n \n'
+    b'trailer\n<</Size 6/Root 1 0 R>>\nstartxref\n357\n%%EOF\n'
+)
+
+# Candidate "authors" that are really section headings or topic phrases
+_FALSE_POSITIVE_AUTHORS = frozenset({
+    'Abstract', 'Introduction', 'Keywords', 'References', 'Acknowledgment',
+    'Conclusion', 'Results', 'Methods', 'Machine Learning',
+    'Artificial Intelligence', 'Deep Learning',
+})
+# Words that mark a CamelCase line as a title rather than a name
+_TITLE_WORDS = frozenset({
+    'Machine', 'Learning', 'System', 'Track', 'Enable', 'Urban', 'Mobility',
+    'Enhanced', 'Real', 'Time', 'Smart', 'Transit', 'Bus',
+})
+# Narrower title-word set used by the department-only fallback strategy
+_TITLE_WORDS_FALLBACK = frozenset({
+    'System', 'Track', 'Enable', 'Urban', 'Mobility', 'Enhanced', 'Real',
+})
+
+
+def _split_camel(name: str) -> str:
+    """Insert a space at each ASCII lower->upper boundary ("JohnSmith" -> "John Smith")."""
+    out = []
+    append = out.append
+    prev = ''
+    for ch in name:
+        if 'A' <= ch <= 'Z' and 'a' <= prev <= 'z':
+            append(' ')
+        append(ch)
+        prev = ch
+    return ''.join(out)
+
+
+def _space_after_dots(name: str) -> str:
+    """Insert a space after a dot followed by an ASCII capital ("G.Rishab" -> "G. Rishab")."""
+    out = []
+    append = out.append
+    prev = ''
+    for ch in name:
+        if 'A' <= ch <= 'Z' and prev == '.':
+            append(' ')
+        append(ch)
+        prev = ch
+    return ''.join(out)
+
+
+def _name_kind(line: str) -> Optional[str]:
+    """Classify an author candidate line with a single regex pass."""
+    match = _RE_NAME_ALL.match(line)
+    if not match:
+        return None
+    kind = match.lastgroup
+    # CamelCase names outside the length window fall through to the title check
+    if kind == 'camel' and not 10 < len(line) < 60:
+        return 'title' if _RE_TITLE_NAME.match(line) else None
+    return kind
+
+
+class _TextBudgetReached(Exception):
+    """Raised from the pypdf text visitor once enough text has been collected."""
+
 
 class PDFMetadataExtractor:
     """Extract bibliographic information from PDF documents."""
 
-    def extract_metadata(self, pdf_path: str) -> Dict[str, any]:
+    def __init__(self, cache_dir: Optional[str] = None, backend: str = "auto"):
         """
-        Extract metadata from a PDF file.
-
         Args:
-            pdf_path: Path to PDF file
-
-        Returns:
-            Dictionary with metadata fields
+            cache_dir: Directory for cached extraction results keyed by file
+                content fingerprint. Caching is disabled when None.
+            backend: "pymupdf", "pypdf", or "auto" (PyMuPDF when installed)
         """
-        metadata = {
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+        if backend == "auto":
+            backend = "pymupdf" if pymupdf is not None else "pypdf"
+        elif backend == "pymupdf" and pymupdf is None:
+            log.warning("PyMuPDF is not installed, falling back to pypdf")
+            backend = "pypdf"
+        self.backend = backend
+
+    def _fingerprint(self, pdf_path: str) -> Optional[str]:
+        """Fingerprint a PDF from its size plus its first and last 64 KiB (the cache key)."""
+        try:
+            size = os.path.getsize(pdf_path)
+            h = hashlib.blake2b(digest_size=16)
+            with open(pdf_path, 'rb') as f:
+                h.update(f.read(_FINGERPRINT_BYTES))
+                if size > _FINGERPRINT_BYTES:
+                    f.seek(max(size - _FINGERPRINT_BYTES, _FINGERPRINT_BYTES))
+                    h.update(f.read())
+            return f"v{_EXTRACTOR_VERSION}-{self.backend}-{h.hexdigest()}-{size}"
+        except OSError as e:
+            log.debug(f"Could not fingerprint {pdf_path}: {e}")
+            return None
+
+    def _load_cached(self, key: str) -> Optional[Dict[str, any]]:
+        """Load cached content fields for a fingerprint, if present."""
+        cache_file = self.cache_dir / f"{key}.json"
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store_cached(self, key: str, fields: Dict[str, any]):
+        """Persist content fields for a fingerprint (atomic replace)."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = self.cache_dir / f"{key}.json"
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(fields, f, ensure_ascii=False)
+            os.replace(tmp_file, cache_file)
+        except (OSError, TypeError) as e:
+            log.debug(f"Could not cache metadata {key}: {e}")
+
+    @staticmethod
+    def _empty_metadata(pdf_path: str) -> Dict[str, any]:
+        """Metadata skeleton with every field unset."""
+        return {
             'filename': os.path.basename(pdf_path),
             'filepath': pdf_path,
             'title': None,
@@ -34,11 +216,49 @@ class PDFMetadataExtractor:
             'abstract': None,
         }
 
+    def _from_cache(self, pdf_path: str, cache_key: str) -> Optional[Dict[str, any]]:
+        """Build the full metadata dict from a cache entry, or None on a miss."""
+        cached = self._load_cached(cache_key)
+        if cached is None:
+            return None
+
+        log.debug(f"Metadata cache hit for {pdf_path}")
+        metadata = self._empty_metadata(pdf_path)
+        metadata.update((k, cached[k]) for k in _CONTENT_FIELDS if k in cached)
+        if not metadata['title']:
+            metadata['title'] = self._title_from_filename(metadata['filename'])
+        return metadata
+
+    def get_cached_metadata(self, pdf_path: str) -> Optional[Dict[str, any]]:
+        """Return cached metadata for a PDF without parsing it, or None."""
+        if not self.cache_dir:
+            return None
+        cache_key = self._fingerprint(pdf_path)
+        return self._from_cache(pdf_path, cache_key) if cache_key else None
+
+    def extract_metadata(self, pdf_path: str, force_refresh: bool = False) -> Dict[str, any]:
+        """
+        Extract metadata from a PDF file.
+
+        Args:
+            pdf_path: Path to PDF file
+            force_refresh: Re-parse the PDF even if a cached result exists
+
+        Returns:
+            Dictionary with metadata fields
+        """
+        metadata = self._empty_metadata(pdf_path)
+
+        cache_key = self._fingerprint(pdf_path) if self.cache_dir else None
+        if cache_key and not force_refresh:
+            cached = self._from_cache(pdf_path, cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            reader = PdfReader(pdf_path)
+            pdf_info, read_first_page = self._open_pdf(pdf_path)
 
             # Extract from PDF metadata
-            pdf_info = reader.metadata
             if pdf_info:
                 log.debug(f"PDF metadata found: {pdf_info}")
                 metadata['title'] = pdf_info.get('/Title', None)
@@ -57,8 +277,9 @@ class PDFMetadataExtractor:
                 log.debug("No PDF metadata found")
 
             # Extract from first page text (fallback for missing metadata)
-            if len(reader.pages) > 0:
-                first_page_text = reader.pages[0].extract_text()
+            first_page_text = read_first_page()
+            if first_page_text is not None:
+                head = first_page_text[:1000]
 
                 # If title not in metadata, try to extract from first page
                 if not metadata['title']:
@@ -75,64 +296,129 @@ class PDFMetadataExtractor:
 
                 # Extract year from first page if not in metadata
                 if not metadata['year']:
-                    metadata['year'] = self._extract_year_from_text(first_page_text)
+                    metadata['year'] = self._extract_year_from_text(head)
 
                 # Extract DOI
                 metadata['doi'] = self._extract_doi(first_page_text)
 
                 # Extract journal name
-                metadata['journal'] = self._extract_journal(first_page_text)
+                metadata['journal'] = self._extract_journal(head)
 
                 # Extract abstract (first few paragraphs)
                 metadata['abstract'] = self._extract_abstract(first_page_text)
 
+            if cache_key:
+                self._store_cached(cache_key, {k: metadata[k] for k in _CONTENT_FIELDS})
+
             # Fallback: use filename as title if still no title
             if not metadata['title']:
-                metadata['title'] = os.path.splitext(metadata['filename'])[0].replace('_', ' ').replace('-', ' ')
+                metadata['title'] = self._title_from_filename(metadata['filename'])
 
         except Exception as e:
             log.error(f"Error extracting metadata from {pdf_path}: {e}")
 
         return metadata
 
-    def _parse_authors(self, author_str: str) -> List[str]:
+    def _open_pdf(self, pdf_path: str):
+        """
+        Open a PDF with the configured backend.
+
+        Returns:
+            Tuple of (document info using pypdf-style keys such as '/Title',
+            callable returning the first page text or None for an empty PDF)
+        """
+        if self.backend == "pymupdf":
+            with pymupdf.open(pdf_path) as doc:
+                meta = doc.metadata or {}
+                first_page_text = doc[0].get_text("text") if doc.page_count > 0 else None
+            pdf_info = {key: meta[name] for key, name in (('/Title', 'title'),
+                                                          ('/Author', 'author'),
+                                                          ('/CreationDate', 'creationDate'))
+                        if meta.get(name)}
+            return pdf_info, lambda: first_page_text
+
+        reader = PdfReader(pdf_path)
+
+        def read_first_page():
+            if len(reader.pages) > 0:
+                return self._extract_first_page_text(reader.pages[0])
+            return None
+
+        return reader.metadata, read_first_page
+
+    @staticmethod
+    def _extract_first_page_text(page) -> str:
+        """
+        Extract text from a page, aborting once the character budget is hit.
+
+        Pages under the budget yield exactly ``page.extract_text()``; longer
+        pages return the text collected up to the point extraction stopped.
+        """
+        parts = []
+        collected = 0
+
+        def visitor(text, cm, tm, font_dict, font_size):
+            nonlocal collected
+            if text:
+                parts.append(text)
+                collected += len(text)
+                if collected >= _FIRST_PAGE_CHAR_BUDGET:
+                    raise _TextBudgetReached
+
+        try:
+            return page.extract_text(visitor_text=visitor)
+        except _TextBudgetReached:
+            return "".join(parts)
+
+    @staticmethod
+    def _title_from_filename(filename: str) -> str:
+        """Build a fallback title from a PDF filename."""
+        # Drop the extension like os.path.splitext (leading dots don't count)
+        dot = filename.rfind('.')
+        if dot > 0 and filename[:dot].strip('.'):
+            filename = filename[:dot]
+        return filename.translate(_FILENAME_SEPARATORS)
+
+    @staticmethod
+    def _parse_authors(author_str: str) -> List[str]:
         """Parse author string into list of authors."""
         if not author_str:
             return []
 
         # Split by common delimiters
-        authors = re.split(r'[;,]|\sand\s|\s&\s|\n', author_str)
+        authors = _RE_AUTHOR_SPLIT.split(author_str)
 
         # Clean up each author name
         cleaned = []
         for author in authors:
             author = author.strip()
-            # Remove email addresses
-            author = re.sub(r'\s*\([^)]*@[^)]*\)', '', author)
-            # Remove affiliations in parentheses/brackets
-            author = re.sub(r'\s*[\[\(][^\]\)]*[\]\)]', '', author)
-            # Remove trailing numbers and symbols
-            author = re.sub(r'[\d\*†‡§¹²³⁴⁵⁶⁷⁸⁹⁰,]+$', '', author).strip()
+            # Remove email addresses and affiliations in parentheses/brackets
+            author = _RE_EMAIL_OR_AFFIL.sub('', author)
+            # Remove trailing numbers and symbols (after the removals above,
+            # since they can expose a new end of string)
+            author = _RE_TRAIL.sub('', author).strip()
 
             if author and len(author) > 2:
                 cleaned.append(author)
 
         return cleaned
 
-    def _extract_year(self, date_str: str) -> Optional[int]:
+    @staticmethod
+    def _extract_year(date_str: str) -> Optional[int]:
         """Extract year from date string."""
         if not date_str:
             return None
 
         # Look for 4-digit year
-        match = re.search(r'(\d{4})', str(date_str))
+        match = _RE_YEAR4.search(str(date_str))
         if match:
             year = int(match.group(1))
             if 1900 <= year <= 2100:
                 return year
         return None
 
-    def _extract_title_from_text(self, text: str) -> Optional[str]:
+    @staticmethod
+    def _extract_title_from_text(text: str) -> Optional[str]:
         """Extract title from first page text (usually the largest/first text)."""
         if not text:
             return None
@@ -145,83 +431,89 @@ class PDFMetadataExtractor:
                 return line
         return None
 
-    def _extract_authors_from_text(self, text: str) -> List[str]:
+    @staticmethod
+    def _extract_authors_from_text(text: str) -> List[str]:
         """Extract author names from first page text."""
         if not text:
             return []
 
         authors = []
         lines = text.split('\n')
+        num_lines = len(lines)
+
+        # Strip and lowercase each line once; no strategy looks past line 60,
+        # so the next-line affiliation tests become plain list lookups.
+        stripped = [l.strip() for l in lines[:61]]
+        lowered = [l.lower() for l in stripped]
 
         # Strategy 0: Look for web article author bylines (before checking academic format)
         # Common patterns: "By Author Name", "Author Name", standalone names
-        for i in range(3, min(len(lines), 30)):
-            line = lines[i].strip()
+        for i in range(3, min(num_lines, 30)):
+            line = stripped[i]
 
             # Pattern: "By Author Name" or just "Author Name" on its own line
-            if re.match(r'^(?:By\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})$', line):
+            if _RE_BYLINE.match(line):
                 # Check if next line doesn't look like an author (avoid collecting title)
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip().lower()
+                if i + 1 < num_lines:
+                    next_line = lowered[i + 1]
                     # If next line has many words or looks like content, current line is author
                     if (len(next_line.split()) > 4 or
                         any(word in next_line for word in ['large', 'language', 'model', 'agent',
                                                             'paper', 'article', 'research', 'study'])):
-                        author_name = re.sub(r'^By\s+', '', line)
+                        author_name = _RE_BY_PREFIX.sub('', line)
                         authors.append(author_name.strip())
                         if authors:  # Found web article author, return early
                             return authors
 
+        # Strategies 1 and 2 both need an affiliation line after the name;
+        # without any affiliation keyword in the head they cannot match.
+        head = '\n'.join(lowered)
+        if not ('department' in head or 'university' in head or 'college' in head):
+            return []
+
+        is_dept = [lo.startswith('department') or 'department of' in lo for lo in lowered]
+        is_affil = [dept or 'university' in lo or 'college' in lo
+                    for dept, lo in zip(is_dept, lowered)]
+
         # Skip first 5 lines (usually title) and scan for author section
         start_line = 3
 
         # Strategy 1: Look for the author section (names followed by "Department")
         # This is the most reliable pattern for academic papers
-        for i in range(start_line, min(len(lines), 60)):
-            line = lines[i].strip()
-
+        # Pair each line with its successor's flags; zip stops at the last line
+        # that has a successor, so no index or bounds checks are needed.
+        for line, next_is_affil in zip(stripped[start_line:60], is_affil[start_line + 1:61]):
             if not line or len(line) > 200:
                 continue
 
-            # Check if next line has department/university keywords
-            if i + 1 < len(lines):
-                next_line = lines[i + 1].strip().lower()
-
-                # If next line starts with "department", current line is likely an author
-                if (next_line.startswith('department') or 'department of' in next_line or
-                    'university' in next_line or 'college' in next_line):
-
-                    # CamelCase name: "NadimpalliMadanaKailashVarma"
-                    if re.match(r'^([A-Z][a-z]+){2,6}$', line) and 10 < len(line) < 60:
-                        name = re.sub(r'([a-z])([A-Z])', r'\1 \2', line)
-                        # Filter out title words
-                        title_words = ['Machine', 'Learning', 'System', 'Track', 'Enable',
-                                      'Urban', 'Mobility', 'Enhanced', 'Real', 'Time', 'Smart',
-                                      'Transit', 'Bus']
-                        if not any(word in name for word in title_words):
-                            authors.append(name.strip())
+            # If next line has department/university keywords, current line is likely an author
+            if next_is_affil:
 
-                    # Single initial + name: "G.RishabBabu"
-                    elif re.match(r'^[A-Z]\.(?:\s*[A-Z][a-z]+){1,3}$', line):
-                        name = re.sub(r'\.([A-Z])', r'. \1', line)
-                        name = re.sub(r'([a-z])([A-Z])', r'\1 \2', name)
-                        authors.append(name.strip())
+                kind = _name_kind(line)
 
-                    # Multi-letter initial + name: "Md.IrfanAhmed" or "Dr.JohnSmith"
-                    elif re.match(r'^[A-Z][a-z]{1,3}\.(?:\s*[A-Z][a-z]+){1,4}$', line):
-                        name = re.sub(r'\.([A-Z])', r'. \1', line)
-                        name = re.sub(r'([a-z])([A-Z])', r'\1 \2', name)
+                # CamelCase name: "NadimpalliMadanaKailashVarma"
+                if kind == 'camel':
+                    name = _split_camel(line)
+                    # Filter out title words
+                    if not any(word in name for word in _TITLE_WORDS):
                         authors.append(name.strip())
 
-                    # Title + name: "Mrs.FatimaUnnisa" or "Prof.JohnSmith"
-                    elif re.match(r'^(?:Mrs?\.?|Dr\.?|Prof\.?)[A-Z]', line):
-                        name = re.sub(r'(^(?:Mrs?|Dr|Prof))\.([A-Z])', r'\1. \2', line)
-                        name = re.sub(r'([a-z])([A-Z])', r'\1 \2', name)
-                        authors.append(name.strip())
+                # Single initial + name: "G.RishabBabu"
+                # Multi-letter initial + name: "Md.IrfanAhmed" or "Dr.JohnSmith"
+                elif kind in ('initial', 'abbrev'):
+                    name = _space_after_dots(line)
+                    name = _split_camel(name)
+                    authors.append(name.strip())
 
-                    # Normal spaced name: "John Smith"
-                    elif re.match(r'^[A-Z][a-z]+(\s+[A-Z][a-z]+){1,4}$', line):
-                        authors.append(line.strip())
+                # Title + name: "Mrs.FatimaUnnisa" or "Prof.JohnSmith"
+                elif kind == 'title':
+                    name = _RE_TITLE_DOT.sub(r'\1. \2', line)
+                    name = _split_camel(name)
+                    authors.append(name.strip())
+
+                # Normal spaced name: "John Smith"
+                elif kind == 'normal':
+                    authors.append(line.strip())
 
             # Stop after finding 10 authors
             if len(authors) >= 10:
@@ -230,120 +522,177 @@ class PDFMetadataExtractor:
         # Strategy 2: If still no authors, look for names followed by "Department" pattern
         # This is common in IEEE/ACM papers: Name\nDepartment of...\n
         if len(authors) < 2:  # Need at least 2 authors
-            for i, line in enumerate(lines[:60]):
-                line = line.strip()
-
-                # Check if next line has department/university
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip().lower()
-
-                    # If next line starts with "department", current line might be an author
-                    if next_line.startswith('department') or 'department of' in next_line:
-                        # Current line should be a name (handle both normal and CamelCase)
-                        if re.match(r'^([A-Z][a-z]+){2,6}$', line) and 10 < len(line) < 60:
-                            # CamelCase name
-                            name = re.sub(r'([a-z])([A-Z])', r'\1 \2', line)
-                            # Don't add if it looks like a title
-                            if not any(word in name for word in ['System', 'Track', 'Enable', 'Urban', 'Mobility', 'Enhanced', 'Real']):
-                                authors.append(name.strip())
-                        elif re.match(r'^[A-Z]\.(?:\s*[A-Z][a-z]+){1,3}$', line):
-                            # Initial format: "G.RishabBabu"
-                            name = re.sub(r'\.([A-Z])', r'. \1', line)
-                            name = re.sub(r'([a-z])([A-Z])', r'\1 \2', name)
-                            authors.append(name.strip())
-                        elif re.match(r'^(?:Mrs?\.?|Dr\.?|Prof\.?)\s*[A-Z]', line):
-                            # Title + name: "Mrs.FatimaUnnisa"
-                            name = re.sub(r'\.([A-Z])', r'. \1', line)
-                            name = re.sub(r'([a-z])([A-Z])', r'\1 \2', name)
+            for line, next_is_dept in zip(stripped[:60], is_dept[1:61]):
+                # If next line starts with "department", current line might be an author
+                if next_is_dept:
+                    # Current line should be a name (handle both normal and CamelCase)
+                    kind = _name_kind(line)
+                    if kind == 'camel':
+                        # CamelCase name
+                        name = _split_camel(line)
+                        # Don't add if it looks like a title
+                        if not any(word in name for word in _TITLE_WORDS_FALLBACK):
                             authors.append(name.strip())
+                    elif kind == 'initial':
+                        # Initial format: "G.RishabBabu"
+                        name = _space_after_dots(line)
+                        name = _split_camel(name)
+                        authors.append(name.strip())
+                    elif _RE_TITLE_NAME_SPACED.match(line):
+                        # Title + name: "Mrs.FatimaUnnisa"
+                        name = _space_after_dots(line)
+                        name = _split_camel(name)
+                        authors.append(name.strip())
 
         # Clean up and deduplicate
         cleaned_authors = []
         seen = set()
         for author in authors[:15]:  # Check up to 15 potential authors
             author = author.strip()
-            # Remove trailing numbers, symbols, and extra text
-            author = re.sub(r'[\d\*†‡§¹²³⁴⁵⁶⁷⁸⁹⁰]+$', '', author).strip()
-            # Remove email addresses
-            author = re.sub(r'\s*[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', '', author).strip()
+            # Remove trailing numbers/symbols and email addresses
+            author = _RE_TRAIL_OR_EMAIL.sub('', author).strip()
 
             # Validate: must be at least 4 chars, start with capital, contain at least one space or dot
             if (author and len(author) >= 4 and author[0].isupper() and
                 (' ' in author or '.' in author) and author not in seen):
                 # Skip if it's a common false positive
-                false_positives = ['Abstract', 'Introduction', 'Keywords', 'References',
-                                  'Acknowledgment', 'Conclusion', 'Results', 'Methods',
-                                  'Machine Learning', 'Artificial Intelligence', 'Deep Learning']
-                if author not in false_positives:
+                if author not in _FALSE_POSITIVE_AUTHORS:
                     cleaned_authors.append(author)
                     seen.add(author)
 
         return cleaned_authors[:10]  # Limit to first 10 authors
 
-    def _extract_year_from_text(self, text: str) -> Optional[int]:
+    @staticmethod
+    def _extract_year_from_text(text: str) -> Optional[int]:
         """Extract publication year from text."""
         if not text:
             return None
 
-        # Look for year patterns (1900-2100)
-        matches = re.findall(r'\b(19\d{2}|20\d{2})\b', text[:1000])
-        if matches:
-            # Return the most recent reasonable year
-            years = [int(y) for y in matches if 1900 <= int(y) <= 2100]
-            if years:
-                return max(years)
-        return None
+        # Look for year patterns (1900-2100) in the first 1000 chars and keep
+        # the most recent one; endpos avoids copying a slice of the text
+        best = 0
+        for match in _RE_YEARS.finditer(text, 0, 1000):
+            year = int(match.group(1))
+            if 1900 <= year <= 2100 and year > best:
+                best = year
+        return best or None
 
-    def _extract_doi(self, text: str) -> Optional[str]:
+    @staticmethod
+    def _extract_doi(text: str) -> Optional[str]:
         """Extract DOI from text."""
         if not text:
             return None
 
-        # DOI pattern: 10.xxxx/xxxxx
-        match = re.search(r'10\.\d{4,}/[^\s]+', text)
+        # DOI pattern: 10.xxxx/xxxxx; str.find skips ahead to the first
+        # "10." so DOI-free text never reaches the regex engine
+        idx = text.find('10.')
+        if idx < 0:
+            return None
+        match = _RE_DOI.search(text, idx)
         if match:
             return match.group(0).rstrip('.,;)')
         return None
 
-    def _extract_journal(self, text: str) -> Optional[str]:
+    @staticmethod
+    def _extract_journal(text: str) -> Optional[str]:
         """Extract journal name from text."""
         if not text:
             return None
 
         # Look for common journal indicators
-        patterns = [
-            r'(?:Published in|Journal of|Proceedings of)\s+([^\n]+)',
-            r'([A-Z][a-z]+\s+(?:Journal|Review|Letters|Transactions)(?:\s+(?:of|on|in))?\s+[^\n]+)',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text[:1000])
+        for pattern in _RE_JOURNAL_PATTERNS:
+            match = pattern.search(text[:1000])
             if match:
                 journal = match.group(1).strip()
                 # Clean up
-                journal = re.sub(r'\s+', ' ', journal)
+                journal = _RE_WHITESPACE.sub(' ', journal)
                 return journal[:200]  # Limit length
         return None
 
-    def _extract_abstract(self, text: str) -> Optional[str]:
+    @staticmethod
+    def _extract_abstract(text: str) -> Optional[str]:
         """Extract abstract from text."""
         if not text:
             return None
 
-        # Look for "Abstract" section
-        match = re.search(r'(?i)abstract[:\s]*\n(.+?)(?:\n\n|\n[A-Z]|\nKeywords:)', text, re.DOTALL)
+        # Look for "Abstract" section, starting the regex at the first
+        # occurrence of the keyword (offsets only line up if lower() kept
+        # the length, which holds for everything but a few exotic letters)
+        lowered = text.lower()
+        idx = lowered.find('abstract')
+        if idx < 0:
+            return None
+        if len(lowered) != len(text):
+            idx = 0
+        match = _RE_ABSTRACT.search(text, idx)
         if match:
             abstract = match.group(1).strip()
             # Clean up
-            abstract = re.sub(r'\s+', ' ', abstract)
+            abstract = _RE_WHITESPACE.sub(' ', abstract)
             return abstract[:500]  # Limit length
         return None
 
 
 # Singleton instance
-_extractor = PDFMetadataExtractor()
-
-
-def extract_pdf_metadata(pdf_path: str) -> Dict[str, any]:
-    """Extract metadata from a PDF file."""
-    return _extractor.extract_metadata(pdf_path)
+_settings = Settings()
+_extractor = PDFMetadataExtractor(cache_dir=_settings.pdf_metadata_cache_dir,
+                                  backend=_settings.pdf_backend)
+
+
+def _warm_up() -> None:
+    """
+    Parse a tiny in-memory PDF with the configured backend.
+
+    Runs once per process (pool initializer, or at import with PDF_PREWARM=1)
+    so font/encoding setup is not charged to the first real document.
+    """
+    try:
+        if _extractor.backend == "pymupdf":
+            with pymupdf.open(stream=_WARMUP_PDF, filetype="pdf") as doc:
+                doc[0].get_text("text")
+        else:
+            reader = PdfReader(io.BytesIO(_WARMUP_PDF))
+            reader.metadata
+            _extractor._extract_first_page_text(reader.pages[0])
+    except Exception as e:
+        log.debug(f"PDF backend warm-up failed: {e}")
+
+
+if _settings.pdf_prewarm:
+    _warm_up()
+
+
+def extract_pdf_metadata(pdf_path: str, force_refresh: bool = False) -> Dict[str, any]:
+    """Extract metadata from a PDF file (cached by file content)."""
+    return _extractor.extract_metadata(pdf_path, force_refresh=force_refresh)
+
+
+def extract_pdf_metadata_batch(pdf_paths: List[str], workers: Optional[int] = None) -> List[Dict[str, any]]:
+    """
+    Extract metadata for many PDFs, parsing cache misses in worker processes.
+
+    pypdf parsing is CPU-bound, so processes (not threads) are used. Files
+    already in the metadata cache are answered here without fanning out.
+
+    Args:
+        pdf_paths: Paths to PDF files
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        List of metadata dicts in the same order as ``pdf_paths``
+    """
+    results = [_extractor.get_cached_metadata(p) for p in pdf_paths]
+    pending = [i for i, meta in enumerate(results) if meta is None]
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    if workers <= 1:
+        for i in pending:
+            results[i] = extract_pdf_metadata(pdf_paths[i])
+        return results
+
+    paths = [pdf_paths[i] for i in pending]
+    chunksize = max(1, len(paths) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_up) as executor:
+        for i, meta in zip(pending, executor.map(extract_pdf_metadata, paths, chunksize=chunksize)):
+            results[i] = meta
+    return results
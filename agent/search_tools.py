@@ -3,14 +3,73 @@ Search tools for finding academic papers and journals from multiple sources.
 Supports Semantic Scholar and arXiv.
 """
 import os
+import io
 import logging
 import requests
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Optional
 from urllib.parse import quote
+from urllib3.util.retry import Retry
 from langchain.tools import tool
 
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # Optional faster XML parser
+    lxml_etree = None
+
+try:
+    import orjson
+except ImportError:  # Optional faster JSON decoder
+    orjson = None
+
 log = logging.getLogger("search_tools")
 
+# Shared HTTP session so repeated searches reuse pooled keep-alive connections
+# instead of paying a new TCP/TLS handshake per request
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET"]),
+)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+
+_ATOM_NS = 'http://www.w3.org/2005/Atom'
+
+
+def _response_json(response: requests.Response):
+    """Decode a JSON response body, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _parse_atom_entries(content: bytes, limit: int) -> list:
+    """
+    Parse up to `limit` Atom <entry> elements from a feed.
+
+    Uses lxml's streaming iterparse when installed so parsing stops after the
+    last wanted entry; otherwise falls back to ElementTree.
+    """
+    if lxml_etree is None:
+        root = ET.fromstring(content)
+        return root.findall(f'{{{_ATOM_NS}}}entry')[:limit]
+
+    entries = []
+    if limit <= 0:
+        return entries
+    for _, elem in lxml_etree.iterparse(io.BytesIO(content), events=('end',),
+                                        tag=f'{{{_ATOM_NS}}}entry'):
+        entries.append(elem)
+        if len(entries) >= limit:
+            break
+    return entries
+
 
 class SemanticScholarSearch:
     """Search Semantic Scholar for academic papers using the public API (no key required)."""
@@ -44,9 +103,9 @@ class SemanticScholarSearch:
                 "fields": "title,authors,year,citationCount,abstract,url,openAccessPdf"
             }
 
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = _SESSION.get(url, params=params, headers=self.headers, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _response_json(response)
 
             if not data.get("data"):
                 return f"No papers found for query: {query}"
@@ -68,17 +127,19 @@ class SemanticScholarSearch:
                 if abstract and len(abstract) > 200:
                     abstract = abstract[:200] + "..."
 
-                result = f"**{title}**\n"
-                result += f"Authors: {authors}\n"
-                result += f"Year: {year} | Citations: {citations}\n"
+                parts = [
+                    f"**{title}**\n",
+                    f"Authors: {authors}\n",
+                    f"Year: {year} | Citations: {citations}\n",
+                ]
                 if abstract:
-                    result += f"Abstract: {abstract}\n"
+                    parts.append(f"Abstract: {abstract}\n")
                 if url:
-                    result += f"URL: {url}\n"
+                    parts.append(f"URL: {url}\n")
                 if pdf_url:
-                    result += f"PDF: {pdf_url}\n"
+                    parts.append(f"PDF: {pdf_url}\n")
 
-                results.append(result)
+                results.append("".join(parts))
 
             return "\n---\n".join(results)
 
@@ -106,21 +167,18 @@ class ArXivSearch:
                 "sortOrder": "descending"
             }
 
-            response = requests.get(self.BASE_URL, params=params, timeout=10)
+            response = _SESSION.get(self.BASE_URL, params=params, timeout=10)
             response.raise_for_status()
 
             # Parse XML response
-            import xml.etree.ElementTree as ET
-            root = ET.fromstring(response.content)
+            entries = _parse_atom_entries(response.content, limit)
 
             # Namespace handling
             ns = {
-                'atom': 'http://www.w3.org/2005/Atom',
+                'atom': _ATOM_NS,
                 'arxiv': 'http://arxiv.org/schemas/atom'
             }
 
-            entries = root.findall('atom:entry', ns)
-
             if not entries:
                 return f"No papers found on arXiv for query: {query}"
 
@@ -135,21 +193,23 @@ class ArXivSearch:
                 author_str = ", ".join(author_names)
 
                 published = entry.find('atom:published', ns).text[:10]  # YYYY-MM-DD
-                summary = entry.find('atom:summary', ns).text.strip().replace('\n', ' ')
-                if len(summary) > 200:
-                    summary = summary[:200] + "..."
+                # Truncate before replacing newlines so only the shown part is copied
+                abstract = entry.find('atom:summary', ns).text.strip()
+                summary = abstract[:200].replace('\n', ' ')
+                if len(abstract) > 200:
+                    summary += "..."
 
                 pdf_link = entry.find('atom:id', ns).text.replace('/abs/', '/pdf/') + '.pdf'
                 abs_link = entry.find('atom:id', ns).text
 
-                result = f"**{title}**\n"
-                result += f"Authors: {author_str}\n"
-                result += f"Published: {published}\n"
-                result += f"Abstract: {summary}\n"
-                result += f"URL: {abs_link}\n"
-                result += f"PDF: {pdf_link}\n"
-
-                results.append(result)
+                results.append("".join([
+                    f"**{title}**\n",
+                    f"Authors: {author_str}\n",
+                    f"Published: {published}\n",
+                    f"Abstract: {summary}\n",
+                    f"URL: {abs_link}\n",
+                    f"PDF: {pdf_link}\n",
+                ]))
 
             return "\n---\n".join(results)
 
@@ -174,19 +234,22 @@ def search_papers(query: str, sources: List[str] = None) -> str:
     if sources is None:
         sources = ['semantic_scholar', 'arxiv']
 
-    all_results = []
-
+    # Each source is an independent HTTP round trip, so query them in parallel
+    # and join in a fixed order once all have returned
+    searches = []
     if 'semantic_scholar' in sources:
         log.info(f"Searching Semantic Scholar for: {query}")
-        ss = SemanticScholarSearch()
-        result = ss.search(query, limit=3)
-        all_results.append(f"=== SEMANTIC SCHOLAR RESULTS ===\n{result}")
-
+        searches.append(("SEMANTIC SCHOLAR", SemanticScholarSearch().search))
     if 'arxiv' in sources:
         log.info(f"Searching arXiv for: {query}")
-        arxiv = ArXivSearch()
-        result = arxiv.search(query, limit=3)
-        all_results.append(f"=== ARXIV RESULTS ===\n{result}")
+        searches.append(("ARXIV", ArXivSearch().search))
+
+    if not searches:
+        return ""
+
+    with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+        futures = [(name, executor.submit(fn, query, limit=3)) for name, fn in searches]
+        all_results = [f"=== {name} RESULTS ===\n{future.result()}" for name, future in futures]
 
     return "\n\n".join(all_results)
 
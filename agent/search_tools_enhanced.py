@@ -4,19 +4,191 @@ Includes: CrossRef (free DOI lookup), PubMed (free medical papers),
 CORE (free academic search), and OpenAlex (free academic graph).
 """
 import os
+import time
 import logging
+import functools
+import threading
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Optional
 from datetime import datetime
+from urllib.parse import urlparse
+from urllib3.util.retry import Retry
+from .search_tools import _response_json
+
+try:
+    from lxml import etree as ET  # C parser, same find/findall API
+except ImportError:
+    import xml.etree.ElementTree as ET
 
 log = logging.getLogger("search_tools_enhanced")
 
+# Longest Retry-After wait honoured per retry (seconds). A throttled provider
+# may ask for minutes, and the caller (a bot search slot) can't wait that long.
+_MAX_RETRY_AFTER = 5.0
+
+
+class _CappedRetry(Retry):
+    """Retry that honours Retry-After, but never waits longer than _MAX_RETRY_AFTER."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, _MAX_RETRY_AFTER)
+
+
+# Shared HTTP session: keep-alive connections to each API host are pooled and
+# reused across searches instead of opening a new TCP/TLS connection per call
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    # Exponential backoff on throttling/server errors, honouring (capped) Retry-After
+    max_retries=_CappedRetry(total=4, backoff_factor=0.5,
+                             status_forcelist=[429, 500, 502, 503, 504],
+                             allowed_methods=["GET"],
+                             respect_retry_after_header=True),
+))
+# Identify the client as CrossRef/OpenAlex etiquette asks
+_SESSION.headers["User-Agent"] = "paper-agent/1.0 (mailto:researcher@example.com)"
+
+
+# Shared read-only stand-in for missing/null nested objects in API records
+_EMPTY = {}
+
+
+class _RateLimiter:
+    """Thread-safe token bucket allowing `rate` requests per second."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            # Reserve the token now; waiters queue up behind each other
+            self._tokens -= 1
+        if wait > 0:
+            time.sleep(wait)
+
+
+# Per-host request budgets, kept under each provider's published limits
+_RATE_LIMITERS = {
+    "api.crossref.org": _RateLimiter(50),
+    "api.openalex.org": _RateLimiter(10),
+    "api.core.ac.uk": _RateLimiter(10),
+    "eutils.ncbi.nlm.nih.gov": _RateLimiter(3),
+}
+
+
+def _get(url: str, **kwargs) -> requests.Response:
+    """GET through the shared session after waiting for the host's rate limit."""
+    limiter = _RATE_LIMITERS.get(urlparse(url).hostname)
+    if limiter is not None:
+        limiter.acquire()
+    return _SESSION.get(url, **kwargs)
+
+
+# Concurrent requests per batch lookup; each holds one pooled keep-alive
+# connection to the same host, and the host's rate limiter still applies
+_MAX_PARALLEL_PER_HOST = 4
+
+
+def _get_json_batch(url: str, param_sets: List[Dict], label: str) -> List[Optional[Dict]]:
+    """
+    GET `url` once per parameter set, in parallel, and decode each JSON body.
+
+    Returns:
+        Decoded bodies in the order of `param_sets` (None for failed requests)
+    """
+    def fetch(params):
+        try:
+            response = _get(url, params=params, timeout=10)
+            response.raise_for_status()
+            return _response_json(response)
+        except Exception as e:
+            log.error(f"{label} error: {e}")
+            return None
+
+    if len(param_sets) <= 1:
+        return [fetch(params) for params in param_sets]
+    with ThreadPoolExecutor(max_workers=min(len(param_sets), _MAX_PARALLEL_PER_HOST)) as executor:
+        return list(executor.map(fetch, param_sets))
+
+
+class _TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value: str):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Formatted results per (source, query, filters) and per aggregated search.
+# Users often repeat a query, and the upstream corpora change slowly.
+_SEARCH_CACHE = _TTLCache(maxsize=1024, ttl=600)
+_AGGREGATE_CACHE = _TTLCache(maxsize=256, ttl=600)
+
+# Results starting with these are failures and must not be cached
+_UNCACHEABLE_PREFIXES = ("Error searching", "CORE search requires")
+
+
+def _cached_search(method):
+    """Cache a `.search()` method's formatted result by class and arguments."""
+    @functools.wraps(method)
+    def wrapper(self, query: str, *args, **kwargs):
+        key = (type(self).__name__, query, args, tuple(sorted(kwargs.items())))
+        cached = _SEARCH_CACHE.get(key)
+        if cached is not None:
+            return cached
+        result = method(self, query, *args, **kwargs)
+        if not result.startswith(_UNCACHEABLE_PREFIXES):
+            _SEARCH_CACHE.set(key, result)
+        return result
+    return wrapper
+
 
 class CrossRefSearch:
     """Search CrossRef for DOI metadata (completely free)."""
 
     BASE_URL = "https://api.crossref.org/works"
 
+    @_cached_search
     def search(self, query: str, limit: int = 5, year_from: Optional[int] = None,
                year_to: Optional[int] = None) -> str:
         """
@@ -44,50 +216,51 @@ class CrossRefSearch:
                 to_date = f"{year_to}-12-31" if year_to else datetime.now().strftime("%Y-%m-%d")
                 params["filter"] = f"from-pub-date:{from_date},until-pub-date:{to_date}"
 
-            response = requests.get(self.BASE_URL, params=params, timeout=10)
+            response = _get(self.BASE_URL, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _response_json(response)
 
             if not data.get("message", {}).get("items"):
                 return f"No papers found for query: {query}"
 
             results = []
-            for item in data["message"]["items"][:limit]:
-                title = item.get("title", ["Unknown"])[0]
-                authors = item.get("author", [])
+            for item in data["message"]["items"]:
+                get = item.get
+                title = get("title", ["Unknown"])[0]
+                authors = get("author", [])
                 author_names = [f"{a.get('given', '')} {a.get('family', '')}".strip()
                                for a in authors[:3]]
                 if len(authors) > 3:
                     author_names.append("et al.")
                 author_str = ", ".join(author_names)
 
-                # Published date
-                pub_date = item.get("published-print", item.get("published-online", {}))
+                # Published date (only look up the online date when print is missing)
+                pub_date = get("published-print") or get("published-online") or _EMPTY
                 year = pub_date.get("date-parts", [[None]])[0][0]
 
                 # Journal
-                journal = item.get("container-title", [""])[0]
+                journal = get("container-title", [""])[0]
 
                 # DOI
-                doi = item.get("DOI", "")
+                doi = get("DOI", "")
 
                 # Citations
-                cited_by = item.get("is-referenced-by-count", 0)
+                cited_by = get("is-referenced-by-count", 0)
 
-                result = f"**{title}**\n"
+                parts = [f"**{title}**\n"]
                 if author_str:
-                    result += f"Authors: {author_str}\n"
+                    parts.append(f"Authors: {author_str}\n")
                 if year:
-                    result += f"Year: {year}"
+                    parts.append(f"Year: {year}")
                 if cited_by:
-                    result += f" | Citations: {cited_by}"
-                result += "\n"
+                    parts.append(f" | Citations: {cited_by}")
+                parts.append("\n")
                 if journal:
-                    result += f"Journal: {journal}\n"
+                    parts.append(f"Journal: {journal}\n")
                 if doi:
-                    result += f"DOI: https://doi.org/{doi}\n"
+                    parts.append(f"DOI: https://doi.org/{doi}\n")
 
-                results.append(result)
+                results.append("".join(parts))
 
             return "\n---\n".join(results)
 
@@ -95,12 +268,39 @@ class CrossRefSearch:
             log.error(f"CrossRef search error: {e}")
             return f"Error searching CrossRef: {str(e)}"
 
+    def get_works_by_dois(self, dois: List[str], chunk_size: int = 30) -> List[Dict]:
+        """
+        Look up many DOIs with one request per chunk instead of one per DOI.
+
+        Args:
+            dois: DOIs to look up (bare, without https://doi.org/)
+            chunk_size: DOIs per request, kept small to avoid HTTP 414
+
+        Returns:
+            Raw CrossRef work records for the DOIs that were found
+        """
+        param_sets = []
+        for start in range(0, len(dois), chunk_size):
+            chunk = dois[start:start + chunk_size]
+            param_sets.append({
+                "filter": ",".join(f"doi:{doi}" for doi in chunk),
+                "rows": len(chunk),
+                "mailto": "researcher@example.com"
+            })
+
+        works = []
+        for data in _get_json_batch(self.BASE_URL, param_sets, "CrossRef DOI lookup"):
+            if data:
+                works.extend(data.get("message", {}).get("items", []))
+        return works
+
 
 class OpenAlexSearch:
     """Search OpenAlex - free and open catalog of scholarly papers."""
 
     BASE_URL = "https://api.openalex.org/works"
 
+    @_cached_search
     def search(self, query: str, limit: int = 5, year_from: Optional[int] = None,
                year_to: Optional[int] = None, author: Optional[str] = None) -> str:
         """
@@ -135,59 +335,61 @@ class OpenAlexSearch:
             if filters:
                 params["filter"] = ",".join(filters)
 
-            response = requests.get(self.BASE_URL, params=params, timeout=10)
+            response = _get(self.BASE_URL, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _response_json(response)
 
             if not data.get("results"):
                 return f"No papers found for query: {query}"
 
             results = []
-            for item in data["results"][:limit]:
-                title = item.get("title", "Unknown title")
+            for item in data["results"]:
+                get = item.get
+                title = get("title", "Unknown title")
 
                 # Authors
-                authorships = item.get("authorships", [])
-                author_names = [a.get("author", {}).get("display_name", "")
+                authorships = get("authorships", [])
+                author_names = [(a.get("author") or _EMPTY).get("display_name", "")
                                for a in authorships[:3]]
                 if len(authorships) > 3:
                     author_names.append("et al.")
                 author_str = ", ".join(author_names)
 
                 # Year
-                year = item.get("publication_year")
+                year = get("publication_year")
 
                 # Citations
-                cited_by = item.get("cited_by_count", 0)
+                cited_by = get("cited_by_count", 0)
 
                 # Venue
-                venue = item.get("host_venue", {}).get("display_name", "")
+                venue = (get("host_venue") or _EMPTY).get("display_name", "")
 
                 # Open access
-                oa_status = item.get("open_access", {}).get("oa_status", "closed")
-                oa_url = item.get("open_access", {}).get("oa_url", "")
+                open_access = get("open_access") or _EMPTY
+                oa_status = open_access.get("oa_status", "closed")
+                oa_url = open_access.get("oa_url", "")
 
-                # DOI
-                doi = item.get("doi", "").replace("https://doi.org/", "")
+                # DOI (null for many works)
+                doi = (get("doi") or "").replace("https://doi.org/", "")
 
-                result = f"**{title}**\n"
+                parts = [f"**{title}**\n"]
                 if author_str:
-                    result += f"Authors: {author_str}\n"
+                    parts.append(f"Authors: {author_str}\n")
                 if year:
-                    result += f"Year: {year}"
+                    parts.append(f"Year: {year}")
                 if cited_by:
-                    result += f" | Citations: {cited_by}"
-                result += "\n"
+                    parts.append(f" | Citations: {cited_by}")
+                parts.append("\n")
                 if venue:
-                    result += f"Venue: {venue}\n"
+                    parts.append(f"Venue: {venue}\n")
                 if oa_status != "closed":
-                    result += f"Open Access: {oa_status.upper()}\n"
+                    parts.append(f"Open Access: {oa_status.upper()}\n")
                 if oa_url:
-                    result += f"PDF: {oa_url}\n"
+                    parts.append(f"PDF: {oa_url}\n")
                 if doi:
-                    result += f"DOI: https://doi.org/{doi}\n"
+                    parts.append(f"DOI: https://doi.org/{doi}\n")
 
-                results.append(result)
+                results.append("".join(parts))
 
             return "\n---\n".join(results)
 
@@ -195,6 +397,32 @@ class OpenAlexSearch:
             log.error(f"OpenAlex search error: {e}")
             return f"Error searching OpenAlex: {str(e)}"
 
+    def get_works_by_ids(self, ids: List[str], chunk_size: int = 50) -> List[Dict]:
+        """
+        Look up many OpenAlex works with one request per chunk.
+
+        Args:
+            ids: OpenAlex work IDs ("W123..." or full https://openalex.org/ URLs)
+            chunk_size: IDs per request (OpenAlex accepts up to 50 OR-ed values)
+
+        Returns:
+            Raw OpenAlex work records for the IDs that were found
+        """
+        param_sets = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            param_sets.append({
+                "filter": "openalex_id:" + "|".join(chunk),
+                "per_page": len(chunk),
+                "mailto": "researcher@example.com"
+            })
+
+        works = []
+        for data in _get_json_batch(self.BASE_URL, param_sets, "OpenAlex ID lookup"):
+            if data:
+                works.extend(data.get("results", []))
+        return works
+
 
 class CORESearch:
     """Search CORE - free access to millions of research papers."""
@@ -204,6 +432,7 @@ class CORESearch:
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("CORE_API_KEY")  # Optional, free tier available
 
+    @_cached_search
     def search(self, query: str, limit: int = 5, year_from: Optional[int] = None,
                year_to: Optional[int] = None) -> str:
         """
@@ -238,15 +467,15 @@ class CORESearch:
                 "limit": limit
             }
 
-            response = requests.get(self.BASE_URL, params=params, headers=headers, timeout=10)
+            response = _get(self.BASE_URL, params=params, headers=headers, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _response_json(response)
 
             if not data.get("results"):
                 return f"No papers found for query: {query}"
 
             results = []
-            for item in data["results"][:limit]:
+            for item in data["results"]:
                 title = item.get("title", "Unknown title")
                 authors = item.get("authors", [])
                 author_str = ", ".join([a for a in authors[:3]])
@@ -261,19 +490,19 @@ class CORESearch:
                 download_url = item.get("downloadUrl", "")
                 doi = item.get("doi", "")
 
-                result = f"**{title}**\n"
+                parts = [f"**{title}**\n"]
                 if author_str:
-                    result += f"Authors: {author_str}\n"
+                    parts.append(f"Authors: {author_str}\n")
                 if year:
-                    result += f"Year: {year}\n"
+                    parts.append(f"Year: {year}\n")
                 if abstract:
-                    result += f"Abstract: {abstract}\n"
+                    parts.append(f"Abstract: {abstract}\n")
                 if download_url:
-                    result += f"PDF: {download_url}\n"
+                    parts.append(f"PDF: {download_url}\n")
                 if doi:
-                    result += f"DOI: {doi}\n"
+                    parts.append(f"DOI: {doi}\n")
 
-                results.append(result)
+                results.append("".join(parts))
 
             return "\n---\n".join(results)
 
@@ -288,6 +517,7 @@ class PubMedSearch:
     SEARCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
     FETCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
 
+    @_cached_search
     def search(self, query: str, limit: int = 5, year_from: Optional[int] = None,
                year_to: Optional[int] = None) -> str:
         """
@@ -320,9 +550,9 @@ class PubMedSearch:
                 "retmode": "json"
             }
 
-            response = requests.get(self.SEARCH_URL, params=search_params, timeout=10)
+            response = _get(self.SEARCH_URL, params=search_params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _response_json(response)
 
             id_list = data.get("esearchresult", {}).get("idlist", [])
 
@@ -336,15 +566,15 @@ class PubMedSearch:
                 "retmode": "xml"
             }
 
-            response = requests.get(self.FETCH_URL, params=fetch_params, timeout=10)
-            response.raise_for_status()
-
-            # Parse XML (simple text extraction)
-            import xml.etree.ElementTree as ET
-            root = ET.fromstring(response.content)
+            # Parse the XML straight off the socket instead of buffering the
+            # body first; decode_content undoes any gzip transfer encoding
+            with _get(self.FETCH_URL, params=fetch_params, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                root = ET.parse(response.raw).getroot()
 
             results = []
-            for article in root.findall(".//PubmedArticle")[:limit]:
+            for article in root.iterfind(".//PubmedArticle"):
                 # Title
                 title_elem = article.find(".//ArticleTitle")
                 title = title_elem.text if title_elem is not None else "Unknown title"
@@ -377,16 +607,16 @@ class PubMedSearch:
                 pmid_elem = article.find(".//PMID")
                 pmid = pmid_elem.text if pmid_elem is not None else ""
 
-                result = f"**{title}**\n"
+                parts = [f"**{title}**\n"]
                 if author_str:
-                    result += f"Authors: {author_str}\n"
-                result += f"Year: {year}\n"
+                    parts.append(f"Authors: {author_str}\n")
+                parts.append(f"Year: {year}\n")
                 if journal:
-                    result += f"Journal: {journal}\n"
+                    parts.append(f"Journal: {journal}\n")
                 if pmid:
-                    result += f"PubMed: https://pubmed.ncbi.nlm.nih.gov/{pmid}/\n"
+                    parts.append(f"PubMed: https://pubmed.ncbi.nlm.nih.gov/{pmid}/\n")
 
-                results.append(result)
+                results.append("".join(parts))
 
             return "\n---\n".join(results)
 
@@ -415,38 +645,49 @@ def search_academic_papers_enhanced(query: str, sources: List[str] = None,
     if sources is None:
         sources = ['openalex', 'crossref', 'arxiv']
 
-    all_results = []
+    cache_key = (tuple(sorted(set(sources))), query, year_from, year_to, author)
+    cached = _AGGREGATE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
+    # Providers are independent network calls: run them in parallel, then join
+    # the blocks in the usual source order
+    searches = []
     if 'openalex' in sources:
         log.info(f"Searching OpenAlex for: {query}")
-        oa = OpenAlexSearch()
-        result = oa.search(query, limit=3, year_from=year_from, year_to=year_to, author=author)
-        all_results.append(f"=== OPENALEX RESULTS (FREE) ===\n{result}")
+        searches.append(("OPENALEX RESULTS (FREE)", OpenAlexSearch().search,
+                         dict(year_from=year_from, year_to=year_to, author=author)))
 
     if 'crossref' in sources:
         log.info(f"Searching CrossRef for: {query}")
-        cr = CrossRefSearch()
-        result = cr.search(query, limit=3, year_from=year_from, year_to=year_to)
-        all_results.append(f"=== CROSSREF RESULTS (FREE) ===\n{result}")
+        searches.append(("CROSSREF RESULTS (FREE)", CrossRefSearch().search,
+                         dict(year_from=year_from, year_to=year_to)))
 
     if 'pubmed' in sources:
         log.info(f"Searching PubMed for: {query}")
-        pm = PubMedSearch()
-        result = pm.search(query, limit=3, year_from=year_from, year_to=year_to)
-        all_results.append(f"=== PUBMED RESULTS (FREE) ===\n{result}")
+        searches.append(("PUBMED RESULTS (FREE)", PubMedSearch().search,
+                         dict(year_from=year_from, year_to=year_to)))
 
     if 'core' in sources:
         log.info(f"Searching CORE for: {query}")
-        core = CORESearch()
-        result = core.search(query, limit=3, year_from=year_from, year_to=year_to)
-        all_results.append(f"=== CORE RESULTS ===\n{result}")
+        searches.append(("CORE RESULTS", CORESearch().search,
+                         dict(year_from=year_from, year_to=year_to)))
 
     # Include original arXiv if requested
     if 'arxiv' in sources:
         from .search_tools import ArXivSearch
         log.info(f"Searching arXiv for: {query}")
-        arxiv = ArXivSearch()
-        result = arxiv.search(query, limit=3)
-        all_results.append(f"=== ARXIV RESULTS (FREE) ===\n{result}")
+        searches.append(("ARXIV RESULTS (FREE)", ArXivSearch().search, {}))
+
+    if not searches:
+        return ""
+
+    with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+        futures = [(header, executor.submit(fn, query, limit=3, **kwargs))
+                   for header, fn, kwargs in searches]
+        outputs = [(header, future.result()) for header, future in futures]
 
-    return "\n\n".join(all_results)
+    result = "\n\n".join(f"=== {header} ===\n{output}" for header, output in outputs)
+    if not any(output.startswith(_UNCACHEABLE_PREFIXES) for _, output in outputs):
+        _AGGREGATE_CACHE.set(cache_key, result)
+    return result
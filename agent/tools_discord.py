@@ -1,14 +1,14 @@
 """
 Discord-specific tools that work with per-user vector stores.
 """
-import os
+import time
 import logging
-from typing import Optional
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain_core.prompts import ChatPromptTemplate
-from .config import Settings
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from .llm_common import get_settings, get_summary_chain
 from .user_store_manager import UserStoreManager
-from .citation_formatter import format_citation
+from .citation_formatter import format_citation_fields
 from langchain.tools import tool
 
 log = logging.getLogger("tools_discord")
@@ -16,6 +16,56 @@ log = logging.getLogger("tools_discord")
 # Global store manager instance
 store_manager = UserStoreManager()
 
+# Short-lived retrieval results keyed by (user, query, index version), plus
+# the retrievals currently running so identical concurrent queries share one
+# embedding + vector search instead of each doing their own.
+_RETRIEVAL_TTL = 60
+_RETRIEVAL_CACHE_SIZE = 2048
+_retrieval_cache = OrderedDict()
+_retrieval_in_flight = {}
+_retrieval_lock = threading.Lock()
+
+
+def _retrieve_docs(user_id: str, query: str):
+    """
+    Retrieve documents for a query, coalescing duplicate concurrent requests.
+
+    Returns:
+        List of documents, or None if the user has no index yet
+    """
+    key = (user_id, query, store_manager.index_version(user_id))
+    with _retrieval_lock:
+        cached = _retrieval_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        future = _retrieval_in_flight.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _retrieval_in_flight[key] = future
+
+    if not is_owner:
+        return future.result()
+
+    try:
+        retriever = store_manager.get_retriever(user_id)
+        docs = retriever.invoke(query) if retriever is not None else None
+    except BaseException as e:
+        with _retrieval_lock:
+            del _retrieval_in_flight[key]
+        future.set_exception(e)
+        raise
+
+    with _retrieval_lock:
+        del _retrieval_in_flight[key]
+        _retrieval_cache[key] = (time.monotonic() + _RETRIEVAL_TTL, docs)
+        _retrieval_cache.move_to_end(key)
+        while len(_retrieval_cache) > _RETRIEVAL_CACHE_SIZE:
+            _retrieval_cache.popitem(last=False)
+    future.set_result(docs)
+    return docs
+
+
 def retrieve_passages_for_user(user_id: str, query: str) -> str:
     """
     Retrieve passages from a specific user's PDFs.
@@ -27,37 +77,37 @@ def retrieve_passages_for_user(user_id: str, query: str) -> str:
     Returns:
         Formatted string with passages and citations
     """
-    retriever = store_manager.get_retriever(user_id)
-
-    if retriever is None:
-        return "No PDFs indexed yet. Please upload PDFs first using the upload command or by attaching PDFs to your message."
-
     try:
-        docs = retriever.invoke(query)
+        docs = _retrieve_docs(user_id, query)
+
+        if docs is None:
+            return "No PDFs indexed yet. Please upload PDFs first using the upload command or by attaching PDFs to your message."
 
         if not docs:
             return "No relevant passages found in your PDFs."
 
         lines = []
         for d in docs:
-            page = d.metadata.get("page", "?")
-            txt = d.page_content.replace("\n", " ")
-            if len(txt) > 450:
-                txt = txt[:450] + "…"
-
-            # Format citation using bibliographic metadata (IEEE style by default)
-            # Parse authors string back to list
-            authors_str = d.metadata.get('bib_authors', '')
-            authors_list = authors_str.split('; ') if authors_str else []
-
-            bib_metadata = {
-                'authors': authors_list,
-                'title': d.metadata.get('bib_title'),
-                'year': d.metadata.get('bib_year'),
-                'journal': d.metadata.get('bib_journal'),
-                'doi': d.metadata.get('bib_doi'),
-            }
-            citation = format_citation(bib_metadata, page=page, style='ieee', inline=True)
+            meta = d.metadata
+            page = meta.get("page", "?")
+            # Truncate before replacing newlines so only the shown part is copied
+            content = d.page_content
+            txt = content[:450].replace("\n", " ")
+            if len(content) > 450:
+                txt += "…"
+
+            # Inline IEEE citation precomputed at index time; indexes built
+            # before that fall back to formatting it from the bibliographic fields
+            citation = meta.get('citation_inline_ieee')
+            if citation is None:
+                # Parse authors string back to list
+                authors_str = meta.get('bib_authors', '')
+                authors_list = authors_str.split('; ') if authors_str else []
+
+                citation = format_citation_fields(
+                    authors_list, meta.get('bib_title'), meta.get('bib_year'),
+                    meta.get('bib_journal'), meta.get('bib_doi'),
+                    page=page, style='ieee', inline=True)
 
             lines.append(f"- {txt}\n  {citation}")
 
@@ -78,14 +128,13 @@ def summarize_with_citations_for_user(user_id: str, query: str) -> str:
     Returns:
         Formatted summary with citations
     """
-    s = Settings()
-    retriever = store_manager.get_retriever(user_id)
-
-    if retriever is None:
-        return "No PDFs indexed yet. Please upload PDFs first."
+    s = get_settings()
 
     try:
-        docs = retriever.invoke(query)
+        docs = _retrieve_docs(user_id, query)
+
+        if docs is None:
+            return "No PDFs indexed yet. Please upload PDFs first."
 
         if not docs:
             return "No relevant information found in your PDFs for this question."
@@ -114,50 +163,22 @@ def summarize_with_citations_for_user(user_id: str, query: str) -> str:
 
         context = "\n\n---\n\n".join(context_parts)
 
-        llm = ChatGoogleGenerativeAI(model=s.llm_model, temperature=0)
-        prompt = ChatPromptTemplate.from_template(
-            """You are a research assistant helping a researcher. Write a concise answer in bullet points.
-Each point MUST be grounded in the CONTEXT provided below.
-
-For EVERY claim, you MUST include an in-text citation in IEEE format using the information from the [Citation: ...] tags.
-
-IEEE In-text Citation Format:
-- Use: (Author(s), Year, p. Page)
-- Example: (Smith, 2020, p. 5)
-- Multiple authors: (Smith et al., 2020, p. 5)
-
-IMPORTANT:
-1. Extract the author name(s), year, and page number from the [Citation: ...] tags in the context
-2. Format each citation exactly as shown in the IEEE format above
-3. Do NOT use generic terms like "context" or "document"
-4. Every factual claim MUST have a citation
-
-If information is missing from the context, state what's missing.
-
-QUESTION:
-{question}
-
-CONTEXT:
-{context}
-""")
-        chain = prompt | llm
+        chain = get_summary_chain(s.llm_model)
         return chain.invoke({"question": query, "context": context}).content
 
     except Exception as e:
         log.error(f"Error summarizing for user {user_id}: {e}")
         return f"Error generating summary: {str(e)}"
 
-def create_user_tools(user_id: str):
-    """
-    Create tools bound to a specific user's context.
+# Tool lists per user, so LangChain only parses the tool signatures and
+# docstrings into argument schemas the first time a user talks to the bot.
+_USER_TOOLS_CACHE_SIZE = 1024
+_user_tools_cache = OrderedDict()
+_user_tools_lock = threading.Lock()
 
-    Args:
-        user_id: Discord user ID
 
-    Returns:
-        List of LangChain tools for the user
-    """
-    from langchain.tools import tool
+def _build_user_tools(user_id: str) -> tuple:
+    """Create the LangChain tools bound to one user."""
     from .search_tools import search_academic_papers
 
     # Create user-specific tools with proper decorators
@@ -171,8 +192,36 @@ def create_user_tools(user_id: str):
         """Summarize information from your PDFs with proper citations."""
         return summarize_with_citations_for_user(user_id, query)
 
-    return [
+    return (
         retrieve_passages,
         summarize_with_citations,
         search_academic_papers
-    ]
+    )
+
+
+def create_user_tools(user_id: str):
+    """
+    Create tools bound to a specific user's context.
+
+    Tools are built once per user and reused on later calls.
+
+    Args:
+        user_id: Discord user ID
+
+    Returns:
+        List of LangChain tools for the user
+    """
+    with _user_tools_lock:
+        tools = _user_tools_cache.get(user_id)
+        if tools is not None:
+            _user_tools_cache.move_to_end(user_id)
+
+    if tools is None:
+        tools = _build_user_tools(user_id)
+        with _user_tools_lock:
+            tools = _user_tools_cache.setdefault(user_id, tools)
+            if len(_user_tools_cache) > _USER_TOOLS_CACHE_SIZE:
+                _user_tools_cache.popitem(last=False)
+
+    # Fresh list so callers can't mutate the cached entry
+    return list(tools)
@@ -1,51 +1,133 @@
 import os
+import re
+import time
+import uuid
+import logging
+from functools import lru_cache
+from typing import Iterator, List, Optional
 from langchain.tools import tool
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+import chromadb
 from langchain_chroma import Chroma
-from langchain_core.prompts import ChatPromptTemplate
-from .config import Settings
-from .citation_formatter import format_citation
+from langchain_core.documents import Document
+from .llm_common import get_settings, get_summary_chain
+from .user_store_manager import index_version
+from .citation_formatter import format_citation_fields
+
+log = logging.getLogger("tools_gemini")
+
+# Answers to paraphrased questions are served from a small vector cache of
+# past questions while the index is unchanged
+_SEMANTIC_CACHE_THRESHOLD = 0.92
+_SEMANTIC_CACHE_TTL = 24 * 3600
+
+# Query that is only a DOI, optionally as "doi:..." or a doi.org URL
+_DOI_QUERY = re.compile(
+    r"\s*(?:doi:\s*|https?://(?:dx\.)?doi\.org/)?(10\.\d{4,9}/\S+?)[\s.,;]*$", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4)
+def _retriever_cached(chroma_dir: str, embed_model: str, top_k: int):
+    """Open the Chroma store (and its embedding client) once per configuration."""
+    emb = GoogleGenerativeAIEmbeddings(model=embed_model)
+    vs = Chroma(persist_directory=chroma_dir, embedding_function=emb)
+    return vs.as_retriever(search_kwargs={"k": top_k})
 
 
 def _retriever():
-    s = Settings()
-    emb = GoogleGenerativeAIEmbeddings(model=s.embed_model)
-    vs = Chroma(persist_directory=s.chroma_dir, embedding_function=emb)
-    return vs.as_retriever(search_kwargs={"k": s.top_k})
+    s = get_settings()
+    return _retriever_cached(s.chroma_dir, s.embed_model, s.top_k)
+
+
+@lru_cache(maxsize=4)
+def _semantic_cache(cache_dir: str):
+    """Collection of answered questions, stored with their query embeddings."""
+    client = chromadb.PersistentClient(path=cache_dir)
+    return client.get_or_create_collection("llm_cache", metadata={"hnsw:space": "cosine"})
+
+
+def _cached_answer(cache, qvec, version: int) -> Optional[str]:
+    """Answer of the closest earlier question, if it is similar and fresh enough."""
+    hits = cache.query(query_embeddings=[qvec], n_results=1,
+                       where={"index_version": version},
+                       include=["metadatas", "distances"])
+    if not hits["ids"][0]:
+        return None
+    meta = hits["metadatas"][0][0]
+    # Cosine distance: similarity is 1 - distance
+    if 1 - hits["distances"][0][0] < _SEMANTIC_CACHE_THRESHOLD:
+        return None
+    if time.time() - meta.get("ts", 0) > _SEMANTIC_CACHE_TTL:
+        return None
+    return meta.get("answer")
+
+def _docs_by_doi(q: str) -> List[Document]:
+    """
+    Chunks of the indexed paper when the query is just its DOI.
+
+    A metadata lookup answers that exactly, without embedding the query or
+    searching the vector index. Returns [] for any other query.
+    """
+    m = _DOI_QUERY.match(q)
+    if m is None:
+        return []
+    result = _retriever().vectorstore.get(where={"bib_doi": m.group(1)}, limit=get_settings().top_k)
+    return [Document(page_content=text, metadata=meta or {})
+            for text, meta in zip(result["documents"], result["metadatas"])]
+
 
 @tool
 def retrieve_passages(q: str) -> str:
     """Retrieve relevant passages from indexed PDF documents based on the query."""
-    docs = _retriever().invoke(q)
+    docs = _docs_by_doi(q) or _retriever().invoke(q)
     lines = []
     for d in docs:
-        page = d.metadata.get("page", "?")
-        txt  = d.page_content.replace("\n", " ")
-        if len(txt) > 450: txt = txt[:450] + "…"
-
-        # Format citation using bibliographic metadata (IEEE style by default)
-        # Parse authors string back to list
-        authors_str = d.metadata.get('bib_authors', '')
-        authors_list = authors_str.split('; ') if authors_str else []
-
-        bib_metadata = {
-            'authors': authors_list,
-            'title': d.metadata.get('bib_title'),
-            'year': d.metadata.get('bib_year'),
-            'journal': d.metadata.get('bib_journal'),
-            'doi': d.metadata.get('bib_doi'),
-        }
-        citation = format_citation(bib_metadata, page=page, style='ieee', inline=True)
+        meta = d.metadata
+        page = meta.get("page", "?")
+        # Truncate before replacing newlines so only the shown part is copied
+        content = d.page_content
+        txt  = content[:450].replace("\n", " ")
+        if len(content) > 450: txt += "…"
+
+        # Inline IEEE citation precomputed at index time; indexes built
+        # before that fall back to formatting it from the bibliographic fields
+        citation = meta.get('citation_inline_ieee')
+        if citation is None:
+            # Parse authors string back to list
+            authors_str = meta.get('bib_authors', '')
+            authors_list = authors_str.split('; ') if authors_str else []
+
+            citation = format_citation_fields(
+                authors_list, meta.get('bib_title'), meta.get('bib_year'),
+                meta.get('bib_journal'), meta.get('bib_doi'),
+                page=page, style='ieee', inline=True)
 
         lines.append(f"- {txt}\n  {citation}")
     return "\n".join(lines) if lines else "No passages found."
 
-@tool
-def summarize_with_citations(q: str) -> str:
-    """Summarize information from indexed PDFs with proper citations."""
-    s = Settings()
-    retriever = _retriever()
-    docs = retriever.invoke(q)
+def _prepare_summary(q: str):
+    """
+    Check the answer cache and build the prompt inputs for a question.
+
+    Returns:
+        (cached answer or None, prompt inputs, callback that caches a new answer)
+    """
+    s = get_settings()
+    vs = _retriever().vectorstore
+
+    # Embed the question once: it keys the answer cache and drives retrieval
+    qvec = vs.embeddings.embed_query(q)
+    version = index_version(s.chroma_dir)
+    cache = None
+    try:
+        cache = _semantic_cache(s.llm_cache_dir)
+        cached = _cached_answer(cache, qvec, version)
+        if cached is not None:
+            return cached, None, None
+    except Exception as e:
+        log.warning(f"Semantic cache lookup failed: {e}")
+
+    docs = vs.similarity_search_by_vector(qvec, k=s.top_k)
 
     # Build context with proper bibliographic metadata for citations
     context_parts = []
@@ -71,31 +153,58 @@ def summarize_with_citations(q: str) -> str:
 
     context = "\n\n---\n\n".join(context_parts)
 
-    llm = ChatGoogleGenerativeAI(model=s.llm_model, temperature=0)
-    prompt = ChatPromptTemplate.from_template(
-        """You are a research assistant. Write a concise answer in bullet points.
-Each point MUST be grounded in the CONTEXT provided below.
+    def remember(answer: str):
+        if cache is None:
+            return
+        now = time.time()
+        try:
+            # Answers for an older index or past the TTL are never served
+            # again; drop them so the collection (and its search) stays small
+            cache.delete(where={"$or": [{"index_version": {"$ne": version}},
+                                        {"ts": {"$lt": now - _SEMANTIC_CACHE_TTL}}]})
+            cache.add(
+                ids=[uuid.uuid4().hex],
+                embeddings=[qvec],
+                documents=[q],
+                metadatas=[{"answer": answer, "ts": now, "index_version": version}],
+            )
+        except Exception as e:
+            log.warning(f"Semantic cache write failed: {e}")
 
-For EVERY claim, you MUST include an in-text citation in IEEE format using the information from the [Citation: ...] tags.
+    return None, {"question": q, "context": context}, remember
 
-IEEE In-text Citation Format:
-- Use: (Author(s), Year, p. Page)
-- Example: (Smith, 2020, p. 5)
-- Multiple authors: (Smith et al., 2020, p. 5)
 
-IMPORTANT:
-1. Extract the author name(s), year, and page number from the [Citation: ...] tags in the context
-2. Format each citation exactly as shown in the IEEE format above
-3. Do NOT use generic terms like "context" or "document"
-4. Every factual claim MUST have a citation
+def _summary_chain():
+    return get_summary_chain(get_settings().llm_model)
 
-If information is missing from the context, state what's missing.
 
-QUESTION:
-{question}
-
-CONTEXT:
-{context}
-""")
-    chain = prompt | llm
-    return chain.invoke({"question": q, "context": context}).content
+@tool
+def summarize_with_citations(q: str) -> str:
+    """Summarize information from indexed PDFs with proper citations."""
+    cached, inputs, remember = _prepare_summary(q)
+    if cached is not None:
+        return cached
+
+    answer = _summary_chain().invoke(inputs).content
+    remember(answer)
+    return answer
+
+
+def summarize_with_citations_stream(q: str) -> Iterator[str]:
+    """
+    Like `summarize_with_citations`, but yields the answer as it is generated.
+
+    Lets a caller show the first tokens to the user instead of waiting for
+    the whole answer. A cached answer is yielded in one piece.
+    """
+    cached, inputs, remember = _prepare_summary(q)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    for chunk in _summary_chain().stream(inputs):
+        text = chunk.text
+        parts.append(text)
+        yield text
+    remember("".join(parts))
@@ -3,19 +3,171 @@ User-specific vector store manager for Discord bot.
 Each user gets their own isolated ChromaDB collection.
 """
 import os
-import glob
+import re
+import json
+import math
+import time
+import hashlib
+import shutil
 import logging
-from typing import Optional, List
+import threading
+import multiprocessing
+from collections import deque
+from functools import lru_cache
+from itertools import repeat
+from operator import mul
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import BinaryIO, Callable, List, Optional, Tuple, Union
 from pathlib import Path
+import chromadb
 from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from .config import Settings
 from .pdf_metadata import extract_pdf_metadata
+from .citation_formatter import CitationFormatter
 
 log = logging.getLogger("user_store_manager")
 
+# Chunks embedded per API call (the Gemini embedding API's batch limit)
+_INDEX_BATCH_SIZE = 100
+
+# Chunks written per Chroma transaction (capped by the client's max batch size)
+_WRITE_BATCH_SIZE = 1000
+
+# Collection that langchain's Chroma wrapper reads by default
+_COLLECTION_NAME = "langchain"
+
+# HNSW settings for new per-user collections, which stay small (well under
+# 100K vectors): a cheaper graph build and search, and fewer index flushes
+# while bulk inserting. Space stays langchain's default (l2).
+_COLLECTION_METADATA = {
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 80,
+    "hnsw:search_ef": 64,
+    "hnsw:batch_size": 1000,
+    "hnsw:sync_threshold": 10000,
+}
+
+# Upper bound on processes used to load PDFs in parallel
+_MAX_LOAD_WORKERS = 8
+
+# Start method for those processes. Not the Linux default "fork": the bot
+# process runs thread pools and chromadb's own threads, and a child forked
+# while one of them holds a lock can deadlock on it. A forkserver is
+# started once (single-threaded) and forks clean workers on request.
+_LOAD_START_METHOD = "forkserver"
+
+# Embedding requests in flight at once during indexing
+_EMBED_WORKERS = 4
+
+# Chunk size when saving an uploaded PDF from a file object
+_COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Characters replaced when sanitizing uploaded filenames
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w.\- ]+")
+_MAX_FILENAME_LENGTH = 200
+# Longest rendered PDF list in get_user_stats (fits one Discord message)
+_MAX_PDF_LIST_CHARS = 1500
+
+# Distinct query texts whose embeddings are remembered
+_QUERY_EMBEDDING_CACHE_SIZE = 4096
+
+# Earlier answers kept per user for near-identical questions: how many, how
+# similar (cosine) a new question must be, and for how long (seconds)
+_ANSWER_CACHE_SIZE = 200
+_ANSWER_CACHE_THRESHOLD = 0.95
+_ANSWER_CACHE_TTL = 24 * 3600
+
+
+def index_version(chroma_dir: Union[str, Path]) -> int:
+    """
+    Modification time of a Chroma index (0 if there is none yet).
+
+    Every write to the index bumps it, so results cached under one version
+    are stale once it changes.
+    """
+    try:
+        return os.stat(os.path.join(chroma_dir, "chroma.sqlite3")).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _load_pdf(pdf_path: str, force: bool = False) -> Optional[List[Document]]:
+    """
+    Load one PDF's pages with its bibliographic metadata attached.
+
+    Top-level so it can run in worker processes. With ``force`` the metadata
+    is extracted again instead of being read from the metadata cache.
+
+    Returns:
+        List of page documents, or None if the PDF could not be loaded
+    """
+    try:
+        pdf_name = os.path.basename(pdf_path)
+        log.info(f"Processing {pdf_name}...")
+
+        # Extract bibliographic metadata
+        pdf_metadata = extract_pdf_metadata(pdf_path, force_refresh=force)
+        log.info(f"  Title: {pdf_metadata.get('title', 'Unknown')}")
+        log.info(f"  Authors: {', '.join(pdf_metadata.get('authors', [])) or 'Unknown'}")
+        log.info(f"  Year: {pdf_metadata.get('year', 'Unknown')}")
+
+        # Bibliographic metadata is the same for every page, so build it once
+        # Convert authors list to string (ChromaDB doesn't support list metadata)
+        authors_list = pdf_metadata.get('authors', [])
+        bib_metadata = {
+            'bib_title': pdf_metadata.get('title'),
+            'bib_authors': "; ".join(authors_list) if authors_list else None,
+            'bib_year': pdf_metadata.get('year'),
+            'bib_journal': pdf_metadata.get('journal'),
+            'bib_doi': pdf_metadata.get('doi'),
+        }
+
+        # Load PDF pages
+        loader = PyPDFLoader(pdf_path)
+        docs = loader.load()
+        for d in docs:
+            # Add bibliographic metadata to each page's metadata
+            d.metadata.update(bib_metadata)
+            # Precompute the inline citation so retrieval doesn't format it per query
+            d.metadata['citation_inline_ieee'] = CitationFormatter.format_inline_citation_fields(
+                authors_list, bib_metadata['bib_year'], page=d.metadata.get('page'))
+
+        log.info(f"Loaded PDF: {pdf_name}")
+        return docs
+    except Exception as e:
+        log.error(f"Error loading {pdf_path}: {e}")
+        return None
+
+
+class _QueryCachedEmbeddings(Embeddings):
+    """
+    Embedding client that remembers query vectors.
+
+    The same question is embedded by the !ask answer cache and again by the
+    retrieval tools the agent calls, often with identical text; repeats are
+    served from an LRU keyed by (model, text). Document embedding for
+    indexing passes straight through.
+    """
+
+    def __init__(self, client: Embeddings, model: str):
+        self.client = client
+        self.model = model
+        self._embed_query = lru_cache(maxsize=_QUERY_EMBEDDING_CACHE_SIZE)(self._embed_query_uncached)
+
+    def _embed_query_uncached(self, model: str, text: str) -> Tuple[float, ...]:
+        return tuple(self.client.embed_query(text))
+
+    def embed_query(self, text: str) -> List[float]:
+        return list(self._embed_query(self.model, text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.client.embed_documents(texts)
+
 
 class UserStoreManager:
     """Manages per-user vector stores for PDF indexing."""
@@ -29,6 +181,38 @@ class UserStoreManager:
             chunk_overlap=150,
             separators=["\n\n", "\n", ".", " "]
         )
+        # Open retrievers per (user_id, k); dropped when the user's index changes.
+        # Agent tool threads add to it while index builds and !clear drop entries.
+        self._retrievers = {}
+        self._retrievers_lock = threading.Lock()
+        self._emb = None
+        self._emb_lock = threading.Lock()
+        # user_id -> (PDF directory mtime, PDF stats) for get_user_stats / find_user_pdf
+        self._stats_cache = {}
+        # user_id -> recent (unit query vector, answer, time, index version)
+        self._answer_cache = {}
+        self._answer_lock = threading.Lock()
+        # user_id -> lock held while that user's index is built, so uploads
+        # from separate messages don't load and embed the same PDFs twice or
+        # overwrite each other's manifest
+        self._build_locks = {}
+        self._build_locks_lock = threading.Lock()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """
+        Embedding client shared by indexing, every retriever and the answer cache.
+
+        Created on first use so constructing the manager needs no API key.
+        The client is safe to call from several threads at once, and query
+        embeddings are memoized (see _QueryCachedEmbeddings).
+        """
+        if self._emb is None:
+            with self._emb_lock:
+                if self._emb is None:
+                    model = self.settings.embed_model
+                    self._emb = _QueryCachedEmbeddings(GoogleGenerativeAIEmbeddings(model=model), model)
+        return self._emb
 
     def _get_user_dir(self, user_id: str) -> Path:
         """Get the directory for a specific user's vector store."""
@@ -48,104 +232,267 @@ class UserStoreManager:
         chroma_dir.mkdir(parents=True, exist_ok=True)
         return chroma_dir
 
-    def save_pdf(self, user_id: str, pdf_content: bytes, filename: str) -> str:
+    def save_pdf(self, user_id: str, pdf_content: Union[bytes, BinaryIO], filename: str) -> str:
         """
         Save a PDF file for a user.
 
         Args:
             user_id: Discord user ID
-            pdf_content: PDF file content in bytes
+            pdf_content: PDF file content as bytes-like object, or a binary
+                file object that is copied in chunks without loading it whole
             filename: Original filename
 
         Returns:
             Path to saved PDF
         """
-        pdf_dir = self._get_pdf_dir(user_id)
-        # Sanitize filename
-        safe_filename = "".join(c for c in filename if c.isalnum() or c in "._- ")
-        pdf_path = pdf_dir / safe_filename
+        pdf_path = self._safe_pdf_path(user_id, filename)
 
         with open(pdf_path, "wb") as f:
-            f.write(pdf_content)
+            if isinstance(pdf_content, (bytes, bytearray, memoryview)):
+                f.write(pdf_content)
+            else:
+                shutil.copyfileobj(pdf_content, f, length=_COPY_BUFFER_SIZE)
+        # Overwriting an existing file leaves the directory mtime unchanged
+        self._stats_cache.pop(user_id, None)
+
+        log.info(f"Saved PDF for user {user_id}: {pdf_path.name}")
+        return str(pdf_path)
 
-        log.info(f"Saved PDF for user {user_id}: {safe_filename}")
+    def move_pdf(self, user_id: str, src_path: str, filename: str) -> str:
+        """
+        Move an already-downloaded PDF into a user's library.
+
+        A rename when ``src_path`` is on the same filesystem as the store,
+        so the file is never read back into memory; otherwise it is copied.
+
+        Args:
+            user_id: Discord user ID
+            src_path: Path of the downloaded file (it no longer exists afterwards)
+            filename: Original filename
+
+        Returns:
+            Path to saved PDF
+        """
+        pdf_path = self._safe_pdf_path(user_id, filename)
+        shutil.move(src_path, pdf_path)
+        self._stats_cache.pop(user_id, None)
+
+        log.info(f"Saved PDF for user {user_id}: {pdf_path.name}")
         return str(pdf_path)
 
+    def _safe_pdf_path(self, user_id: str, filename: str) -> Path:
+        """Destination in the user's PDF directory for an uploaded filename."""
+        # Sanitize filename: drop any directory part, replace runs of unsafe
+        # characters, and clamp the length while keeping the extension
+        safe_filename = _UNSAFE_FILENAME_CHARS.sub("_", os.path.basename(filename)).lstrip(". ")
+        if len(safe_filename) > _MAX_FILENAME_LENGTH:
+            stem, ext = os.path.splitext(safe_filename)
+            safe_filename = stem[:_MAX_FILENAME_LENGTH - len(ext)] + ext
+        safe_filename = safe_filename or "document.pdf"
+        return self._get_pdf_dir(user_id) / safe_filename
+
+    def _scan_user_pdfs(self, user_id: str) -> List[os.DirEntry]:
+        """
+        Directory entries of a user's PDFs (same matches as ``*.pdf`` glob).
+
+        Entries carry the path and name, so callers needing sizes or mtimes
+        don't have to list the directory again.
+        """
+        with os.scandir(self._get_pdf_dir(user_id)) as it:
+            return [e for e in it if e.name.endswith(".pdf") and not e.name.startswith(".")]
+
     def get_user_pdfs(self, user_id: str) -> List[str]:
         """Get list of PDF files for a user."""
-        pdf_dir = self._get_pdf_dir(user_id)
-        return glob.glob(str(pdf_dir / "*.pdf"))
+        return [e.path for e in self._scan_user_pdfs(user_id)]
+
+    def get_user_pdfs_with_mtime(self, user_id: str) -> List[Tuple[str, float]]:
+        """Get (path, mtime) for each of a user's PDFs from a single directory scan."""
+        return [(e.path, e.stat().st_mtime) for e in self._scan_user_pdfs(user_id)]
+
+    def _invalidate_retrievers(self, user_id: str):
+        """Forget cached retrievers for a user so the next lookup reopens the index."""
+        with self._retrievers_lock:
+            for key in [key for key in self._retrievers if key[0] == user_id]:
+                del self._retrievers[key]
+
+    def _get_manifest_path(self, user_id: str) -> Path:
+        """Sidecar file recording which PDF versions are already indexed."""
+        return self._get_user_dir(user_id) / "indexed_files.json"
+
+    def _load_manifest(self, user_id: str) -> dict:
+        """Map of indexed PDF path -> [mtime_ns, size] at the time it was indexed."""
+        try:
+            with open(self._get_manifest_path(user_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, user_id: str, manifest: dict):
+        with open(self._get_manifest_path(user_id), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+
+    @staticmethod
+    def _chunk_id(pdf_name: str, chunk) -> str:
+        """
+        Content-derived chunk id, so unchanged chunks keep their id across builds.
+
+        The metadata is part of the key: a revised PDF whose page text is the
+        same but whose title, authors or year changed gets new ids, so those
+        chunks are re-embedded with the new context header and stored with the
+        new bib_* fields and citation.
+        """
+        metadata = json.dumps(chunk.metadata, sort_keys=True, default=str)
+        key = f"{pdf_name}\0{metadata}\0{chunk.page_content}"
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _upsert_chunks(collection, chunks: dict, ids: list, texts: list, embeddings: list):
+        """Write embedded chunks to the collection in one transaction."""
+        collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=texts,
+            # Chroma rejects None metadata values; missing keys read the same
+            metadatas=[{k: v for k, v in chunks[i].metadata.items() if v is not None}
+                       for i in ids],
+        )
 
-    def build_user_index(self, user_id: str) -> int:
+    @staticmethod
+    def _context_header(metadata: dict) -> str:
+        """Short '[Title — First Author (Year)] ' prefix for contextual embeddings."""
+        title = metadata.get('bib_title')
+        authors = metadata.get('bib_authors')
+        year = metadata.get('bib_year')
+        parts = [title] if title else []
+        if authors:
+            parts.append(authors.split('; ')[0] + (f" ({year})" if year else ""))
+        elif year:
+            parts.append(f"({year})")
+        return f"[{' — '.join(parts)}] " if parts else ""
+
+    def build_user_index(self, user_id: str, force: bool = False) -> int:
         """
         Build or update the vector store index for a user's PDFs.
 
+        Only PDFs that are new or changed since the last build (by mtime and
+        size) are loaded, and only chunks not already in the index are
+        embedded. Chunks of removed or changed PDFs are deleted.
+
         Args:
             user_id: Discord user ID
+            force: Re-embed every PDF, e.g. after metadata extraction changed
+
+        Builds for the same user run one at a time; a build that waited sees
+        the previous one's manifest and only handles what is still new.
 
         Returns:
-            Number of chunks indexed
+            Number of chunks in the user's index
         """
-        pdfs = self.get_user_pdfs(user_id)
-        if not pdfs:
+        with self._build_locks_lock:
+            lock = self._build_locks.setdefault(user_id, threading.Lock())
+        with lock:
+            return self._build_user_index(user_id, force)
+
+    def _build_user_index(self, user_id: str, force: bool) -> int:
+        """Body of build_user_index; the caller holds the user's build lock."""
+        entries = self._scan_user_pdfs(user_id)
+        if not entries:
             log.warning(f"No PDFs found for user {user_id}")
             return 0
 
-        # Load all PDFs with metadata extraction
-        docs = []
-        for pdf_path in pdfs:
-            try:
-                log.info(f"Processing {os.path.basename(pdf_path)}...")
-
-                # Extract bibliographic metadata
-                pdf_metadata = extract_pdf_metadata(pdf_path)
-                log.info(f"  Title: {pdf_metadata.get('title', 'Unknown')}")
-                log.info(f"  Authors: {', '.join(pdf_metadata.get('authors', [])) or 'Unknown'}")
-                log.info(f"  Year: {pdf_metadata.get('year', 'Unknown')}")
-
-                # Load PDF pages
-                loader = PyPDFLoader(pdf_path)
-                for d in loader.load():
-                    # Add bibliographic metadata to each page's metadata
-                    # Convert authors list to string (ChromaDB doesn't support list metadata)
-                    authors_list = pdf_metadata.get('authors', [])
-                    authors_str = "; ".join(authors_list) if authors_list else None
-
-                    d.metadata['bib_title'] = pdf_metadata.get('title')
-                    d.metadata['bib_authors'] = authors_str  # Store as string
-                    d.metadata['bib_year'] = pdf_metadata.get('year')
-                    d.metadata['bib_journal'] = pdf_metadata.get('journal')
-                    d.metadata['bib_doi'] = pdf_metadata.get('doi')
-                    docs.append(d)
-
-                log.info(f"Loaded PDF: {os.path.basename(pdf_path)}")
-            except Exception as e:
-                log.error(f"Error loading {pdf_path}: {e}")
-
-        if not docs:
-            return 0
-
-        # Split into chunks
-        chunks = self.splitter.split_documents(docs)
+        manifest = self._load_manifest(user_id)
+        pdfs = [e.path for e in entries]
+        versions = {}
+        for e in entries:
+            st = e.stat()
+            versions[e.path] = [st.st_mtime_ns, st.st_size]
+        changed = [p for p in pdfs if force or manifest.get(p) != versions[p]]
+        removed = [p for p in manifest if p not in versions]
+
+        # Load new or changed PDFs with metadata extraction. Files are
+        # independent and parsing is CPU-bound, so fan out over processes;
+        # embedding and Chroma writes stay here with a single writer.
+        loaded = {}
+        workers = min(_MAX_LOAD_WORKERS, os.cpu_count() or 1, len(changed))
+        if workers <= 1:
+            results = map(_load_pdf, changed, repeat(force))
+            loaded = {p: docs for p, docs in zip(changed, results) if docs is not None}
+        else:
+            mp_context = multiprocessing.get_context(_LOAD_START_METHOD)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+                results = executor.map(_load_pdf, changed, repeat(force))
+                loaded = {p: docs for p, docs in zip(changed, results) if docs is not None}
 
-        # Create or update ChromaDB
         chroma_dir = self._get_chroma_dir(user_id)
-        emb = GoogleGenerativeAIEmbeddings(model=self.settings.embed_model)
-
-        # Check if collection exists, if so, delete and recreate
-        # This ensures we don't have duplicate chunks
-        if (chroma_dir / "chroma.sqlite3").exists():
-            log.info(f"Updating existing index for user {user_id}")
-
-        vs = Chroma.from_documents(
-            chunks,
-            embedding=emb,
-            persist_directory=str(chroma_dir)
-        )
-        # Note: langchain-chroma auto-persists, no need to call .persist()
+        if not loaded and not (chroma_dir / "chroma.sqlite3").exists():
+            return 0
 
-        log.info(f"Built index for user {user_id}: {len(chunks)} chunks from {len(pdfs)} PDFs")
-        return len(chunks)
+        client = chromadb.PersistentClient(path=str(chroma_dir))
+        # Existing collections keep the settings they were created with.
+        # Vectors are always supplied, so no server-side embedding function.
+        collection = client.get_or_create_collection(
+            _COLLECTION_NAME, metadata=_COLLECTION_METADATA, embedding_function=None)
+
+        for pdf_path in removed:
+            collection.delete(where={"source": pdf_path})
+            del manifest[pdf_path]
+            log.info(f"Removed {os.path.basename(pdf_path)} from index for user {user_id}")
+
+        write_batch_size = min(_WRITE_BATCH_SIZE, client.get_max_batch_size())
+        emb = self.embeddings if loaded else None
+        with ThreadPoolExecutor(max_workers=_EMBED_WORKERS) as executor:
+            for pdf_path, docs in loaded.items():
+                pdf_name = os.path.basename(pdf_path)
+
+                # Split into chunks; identical chunks collapse onto one id
+                chunks = {}
+                for c in self.splitter.split_documents(docs):
+                    chunks.setdefault(self._chunk_id(pdf_name, c), c)
+
+                existing = set(collection.get(where={"source": pdf_path}, include=[])["ids"])
+                new_ids = [i for i in chunks if force or i not in existing]
+
+                # Embed in fixed-size batches, one embedding request each.
+                # Requests run concurrently while finished batches are collected
+                # here in order, so Chroma keeps a single writer.
+                batches = [new_ids[start:start + _INDEX_BATCH_SIZE]
+                           for start in range(0, len(new_ids), _INDEX_BATCH_SIZE)]
+                batch_texts = [[chunks[i].page_content for i in batch_ids] for batch_ids in batches]
+                # Embed each chunk with its paper's title/author/year in front, so
+                # chunks that never name the paper still match questions about it;
+                # the stored document stays the original chunk text
+                header = self._context_header(docs[0].metadata) if docs else ""
+                vectors = executor.map(emb.embed_documents,
+                                       [[header + t for t in texts] for texts in batch_texts])
+
+                # Each upsert is one SQLite commit (PersistentClient auto-persists),
+                # so buffer several embedding batches per write
+                pending_ids, pending_texts, pending_embeddings = [], [], []
+                for batch_ids, texts, embeddings in zip(batches, batch_texts, vectors):
+                    pending_ids += batch_ids
+                    pending_texts += texts
+                    pending_embeddings += embeddings
+                    if len(pending_ids) >= write_batch_size:
+                        self._upsert_chunks(collection, chunks, pending_ids,
+                                            pending_texts, pending_embeddings)
+                        pending_ids, pending_texts, pending_embeddings = [], [], []
+                if pending_ids:
+                    self._upsert_chunks(collection, chunks, pending_ids,
+                                        pending_texts, pending_embeddings)
+
+                stale = list(existing.difference(chunks))
+                if stale:
+                    collection.delete(ids=stale)
+                manifest[pdf_path] = versions[pdf_path]
+                log.info(f"Indexed {pdf_name}: {len(new_ids)} new, {len(stale)} removed, "
+                         f"{len(chunks) - len(new_ids)} unchanged chunks")
+
+        self._save_manifest(user_id, manifest)
+        self._invalidate_retrievers(user_id)
+
+        total = collection.count()
+        log.info(f"Index for user {user_id}: {total} chunks from {len(pdfs)} PDFs")
+        return total
 
     def get_retriever(self, user_id: str, top_k: Optional[int] = None):
         """
@@ -166,10 +513,16 @@ class UserStoreManager:
             return None
 
         k = top_k or self.settings.top_k
-        emb = GoogleGenerativeAIEmbeddings(model=self.settings.embed_model)
-        vs = Chroma(persist_directory=str(chroma_dir), embedding_function=emb)
+        with self._retrievers_lock:
+            retriever = self._retrievers.get((user_id, k))
+        if retriever is None:
+            # Opened outside the lock; if two threads race, the first one stored wins
+            vs = Chroma(persist_directory=str(chroma_dir), embedding_function=self.embeddings)
+            retriever = vs.as_retriever(search_kwargs={"k": k})
+            with self._retrievers_lock:
+                retriever = self._retrievers.setdefault((user_id, k), retriever)
 
-        return vs.as_retriever(search_kwargs={"k": k})
+        return retriever
 
     def clear_user_data(self, user_id: str) -> bool:
         """
@@ -181,8 +534,10 @@ class UserStoreManager:
         Returns:
             True if successful
         """
-        import shutil
-
+        self._invalidate_retrievers(user_id)
+        self._stats_cache.pop(user_id, None)
+        with self._answer_lock:
+            self._answer_cache.pop(user_id, None)
         user_dir = self._get_user_dir(user_id)
         if user_dir.exists():
             shutil.rmtree(user_dir)
@@ -190,22 +545,118 @@ class UserStoreManager:
             return True
         return False
 
+    def index_version(self, user_id: str) -> int:
+        """Version of the user's index (see ``index_version``); 0 if none."""
+        return index_version(self._get_chroma_dir(user_id))
+
+    def get_cached_answer(self, user_id: str, question: str) -> Tuple[Optional[str], Callable[[str], None]]:
+        """
+        Look up the answer to an earlier, near-identical question from the user.
+
+        Only answers given against the user's current index and within
+        ``_ANSWER_CACHE_TTL`` count. The question is embedded once; the
+        returned callback stores a fresh answer under that embedding.
+
+        Returns:
+            (cached answer or None, callback that caches the answer to this question)
+        """
+        version = self.index_version(user_id)
+        try:
+            qvec = self.embeddings.embed_query(question)
+        except Exception as e:
+            log.warning(f"Answer cache lookup failed: {e}")
+            return None, lambda answer: None
+        norm = math.sqrt(sum(x * x for x in qvec)) or 1.0
+        qvec = [x / norm for x in qvec]
+
+        oldest = time.time() - _ANSWER_CACHE_TTL
+        best, best_score = None, _ANSWER_CACHE_THRESHOLD
+        with self._answer_lock:
+            for vec, answer, ts, entry_version in self._answer_cache.get(user_id, ()):
+                if entry_version != version or ts < oldest:
+                    continue
+                score = sum(map(mul, vec, qvec))
+                if score >= best_score:
+                    best, best_score = answer, score
+
+        def remember(answer: str):
+            with self._answer_lock:
+                entries = self._answer_cache.setdefault(user_id, deque(maxlen=_ANSWER_CACHE_SIZE))
+                entries.append((qvec, answer, time.time(), version))
+
+        return best, remember
+
+    def _pdf_stats(self, user_id: str) -> dict:
+        """Cached summary of a user's PDF directory (counts, sizes, names)."""
+        # Adding, removing or renaming a PDF bumps the directory mtime, so the
+        # scan is only redone after the user's PDFs change
+        dir_mtime = os.stat(self._get_pdf_dir(user_id)).st_mtime_ns
+        cached = self._stats_cache.get(user_id)
+        if cached is not None and cached[0] == dir_mtime:
+            return cached[1]
+
+        entries = self._scan_user_pdfs(user_id)
+        names = [e.name for e in entries]
+        total_size = sum(e.stat().st_size for e in entries)
+        pdf_stats = {
+            "pdf_count": len(names),
+            "total_size": total_size,
+            "total_size_mb": round(total_size / (1024 * 1024), 2),
+            "pdf_names": names,
+            "pdf_list_text": self._render_pdf_list(names),
+            # Lower-cased file name -> path, for find_user_pdf
+            "paths_by_name": {e.name.lower(): e.path for e in entries},
+        }
+        self._stats_cache[user_id] = (dir_mtime, pdf_stats)
+        return pdf_stats
+
+    @staticmethod
+    def _render_pdf_list(names: List[str]) -> str:
+        """Bullet list of PDF names, cut off with "… and N more" past _MAX_PDF_LIST_CHARS."""
+        lines = []
+        used = 0
+        for i, name in enumerate(names):
+            line = f"  • {name}"
+            if used + len(line) > _MAX_PDF_LIST_CHARS:
+                lines.append(f"  … and {len(names) - i} more")
+                break
+            lines.append(line)
+            used += len(line) + 1
+        return "\n".join(lines)
+
+    def find_user_pdf(self, user_id: str, name: str) -> Optional[str]:
+        """
+        Find one of a user's PDFs by (part of) its file name, ignoring case.
+
+        An exact file name, with or without ``.pdf``, wins over a partial match.
+
+        Returns:
+            Path to the PDF, or None if nothing matches
+        """
+        paths_by_name = self._pdf_stats(user_id)["paths_by_name"]
+        lower = name.lower()
+        path = paths_by_name.get(lower) or paths_by_name.get(lower + ".pdf")
+        if path is not None:
+            return path
+        return next((p for n, p in paths_by_name.items() if lower in n), None)
+
     def get_user_stats(self, user_id: str) -> dict:
         """
         Get statistics about a user's data.
 
         Returns:
-            Dict with pdf_count, total_size, has_index
+            Dict with pdf_count, total_size, has_index, pdf_names and
+            pdf_list_text (bullet list of names, clamped to one message)
         """
-        pdfs = self.get_user_pdfs(user_id)
-        total_size = sum(os.path.getsize(pdf) for pdf in pdfs)
         chroma_dir = self._get_chroma_dir(user_id)
         has_index = (chroma_dir / "chroma.sqlite3").exists()
+        pdf_stats = self._pdf_stats(user_id)
 
         return {
-            "pdf_count": len(pdfs),
-            "total_size": total_size,
-            "total_size_mb": round(total_size / (1024 * 1024), 2),
+            "pdf_count": pdf_stats["pdf_count"],
+            "total_size": pdf_stats["total_size"],
+            "total_size_mb": pdf_stats["total_size_mb"],
             "has_index": has_index,
-            "pdf_names": [os.path.basename(p) for p in pdfs]
+            "pdf_names": list(pdf_stats["pdf_names"]),
+            "pdf_list_text": pdf_stats["pdf_list_text"]
         }
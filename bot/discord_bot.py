@@ -3,83 +3,61 @@ Discord bot for academic research assistant.
 Handles PDF uploads, user queries, and integrates with the LangChain agent.
 """
 import os
+import shlex
+import hashlib
+import argparse
 import logging
+import aiohttp
 import discord
 from discord.ext import commands
-from typing import Optional
+from typing import Iterator, Optional
 import asyncio
 import io
+import tempfile
 import difflib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 
-from langchain.agents import create_agent
-from langchain_google_genai import ChatGoogleGenerativeAI
-
+# The agent stack (LangChain agents, Gemini chat, per-user tools) and the
+# search tools are imported on first use so the bot can log in sooner
 from agent.config import Settings
 from agent.user_store_manager import UserStoreManager
-from agent.tools_discord import create_user_tools
 from agent.logging_conf import setup_logging
-from agent.search_tools import search_papers as search_papers_tool  # Import with alias to avoid name collision
-from agent.search_tools_enhanced import search_academic_papers_enhanced
 from agent.conversation_manager import ConversationManager
 from agent.citation_export import CitationManager, Citation
 from agent.document_summarizer import DocumentSummarizer
 
 log = logging.getLogger("discord_bot")
 
+# Most agents kept alive at once (one per user and agent kind)
+_AGENT_CACHE_SIZE = 256
 
-class ResearchBot(commands.Bot):
-    """Discord bot for research assistance with per-user PDF management."""
+# Longest !ask / !general input passed to the agent
+_MAX_QUESTION_LENGTH = 4000
 
-    def __init__(self):
-        # Set up intents
-        intents = discord.Intents.default()
-        intents.message_content = True
-        intents.messages = True
+# Agent runs / summaries (Gemini) and external searches allowed at once
+_MAX_CONCURRENT_LLM_RUNS = 8
+_MAX_CONCURRENT_SEARCHES = 4
 
-        super().__init__(
-            command_prefix="!",
-            intents=intents,
-            help_command=None  # We'll create our own help command
-        )
+# Threads for PDF indexing / summaries and for blocking search calls
+_INDEX_WORKERS = 4
+_IO_WORKERS = 16
 
-        self.settings = Settings()
-        self.store_manager = UserStoreManager()
-        self.conversation_manager = ConversationManager()
-        self.citation_manager = CitationManager()
-        self.summarizer = DocumentSummarizer()
-
-    async def on_ready(self):
-        """Called when bot is ready."""
-        log.info(f"Bot logged in as {self.user.name} (ID: {self.user.id})")
-        log.info(f"Connected to {len(self.guilds)} guild(s)")
+# Per-user limit on the commands that call Gemini or search APIs
+_USER_COMMAND_RATE = 10  # commands
+_USER_COMMAND_PER = 60.0  # seconds
 
-    def _build_agent_for_user(self, user_id: str):
-        """Build a LangChain agent for a specific user using LangChain 1.0+ API."""
-        llm = ChatGoogleGenerativeAI(model=self.settings.llm_model, temperature=0)
-        tools = create_user_tools(user_id)
-
-        # Create agent using new API (returns CompiledStateGraph)
-        return create_agent(
-            model=llm,
-            tools=tools,
-            system_prompt="""You are a helpful research assistant. You MUST follow these rules:
+# Answers strictly from the user's PDFs
+_ASK_SYSTEM_PROMPT = """You are a helpful research assistant. You MUST follow these rules:
 1.  Your primary function is to answer questions using ONLY the user's uploaded PDF documents.
 2.  You MUST use the `retrieve_passages` or `summarize_with_citations` tools to find all information.
 3.  You may use the `search_academic_papers` tool if the user asks for external academic papers.
 4.  **CRITICAL**: You MUST provide a specific citation for ALL information in your response.
 5.  **DO NOT** use your general knowledge. If the answer is not in the user's documents, you MUST state that you cannot find the information in the provided documents."""
-        )
 
-    def _build_general_agent_for_user(self, user_id: str):
-        """Build a general-purpose LangChain agent that intelligently searches both local and external sources."""
-        llm = ChatGoogleGenerativeAI(model=self.settings.llm_model, temperature=0)
-        tools = create_user_tools(user_id)
-
-        # Create agent with intelligent fallback behavior
-        return create_agent(
-            model=llm,
-            tools=tools,
-            system_prompt="""You are an intelligent research assistant. Follow this decision process:
+# Tries the user's PDFs first and falls back to external search
+_GENERAL_SYSTEM_PROMPT = """You are an intelligent research assistant. Follow this decision process:
 
 1. **Analyze the user's request** to understand what they need.
 
@@ -104,51 +82,329 @@ class ResearchBot(commands.Bot):
 6. **Never use general knowledge**: Only use information from tools. If no information is found anywhere, clearly state that.
 
 Your goal is to provide the best answer by intelligently combining local and external sources when appropriate."""
+
+# Discord rejects messages over 2000 characters; leave some headroom
+_MESSAGE_LIMIT = 1900
+
+# Minimum seconds between edits of a message that is being streamed into
+_STREAM_EDIT_INTERVAL = 0.5
+
+# Largest piece of an uploaded PDF held in memory while downloading it
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _split_for_discord(text: str, limit: int = _MESSAGE_LIMIT) -> Iterator[str]:
+    """Yield consecutive pieces of ``text`` that each fit in one Discord message."""
+    if not text:
+        yield text
+        return
+    for i in range(0, len(text), limit):
+        yield text[i:i + limit]
+
+
+async def _send_chunked(ctx, text: str, edit_target: Optional[discord.Message] = None,
+                        prefix: str = ""):
+    """
+    Deliver ``text`` as one or more Discord messages.
+
+    The first piece (after ``prefix``) replaces the content of ``edit_target``
+    or, without one, is sent as a reply; the rest follow in order.
+    """
+    chunks = _split_for_discord(text)
+    first = prefix + next(chunks)
+    if edit_target is not None:
+        await edit_target.edit(content=first)
+    else:
+        await ctx.reply(first, suppress_embeds=True)
+    # Sequential on purpose: concurrent sends may arrive out of order
+    for chunk in chunks:
+        await ctx.send(chunk, suppress_embeds=True)
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser that raises ValueError instead of exiting the process."""
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+# Built once; parses the arguments of !fsearch
+_FSEARCH_PARSER = _ArgumentParser(prog="!fsearch", add_help=False)
+_FSEARCH_PARSER.add_argument("--year-from", type=int)
+_FSEARCH_PARSER.add_argument("--year-to", type=int)
+_FSEARCH_PARSER.add_argument("--author")
+_FSEARCH_PARSER.add_argument("query", nargs="*")
+
+
+class _ResponseStream:
+    """
+    Streams text into Discord messages as it is generated.
+
+    The first message (usually the "thinking" reply) is edited as text
+    arrives, at most once per ``_STREAM_EDIT_INTERVAL``. Once it holds
+    ``_MESSAGE_LIMIT`` characters it is finalised and a new message is sent
+    for the rest. Link previews are suppressed, as for every chunked reply:
+    answers are full of paper links and the previews bury the text.
+    """
+
+    def __init__(self, ctx: commands.Context, message: discord.Message):
+        self.ctx = ctx
+        self._message = message
+        self._placeholder = message.content
+        self._parts = []
+        self._pending = ""
+        self._last_edit = 0.0
+        self._rolled_over = False
+
+    @property
+    def text(self) -> str:
+        """All text streamed so far."""
+        return "".join(self._parts) + self._pending
+
+    async def feed(self, text: str):
+        """Append generated text, rolling over to a new message when full."""
+        if not text:
+            return
+        self._pending += text
+        while len(self._pending) > _MESSAGE_LIMIT:
+            head, self._pending = self._pending[:_MESSAGE_LIMIT], self._pending[_MESSAGE_LIMIT:]
+            await self._message.edit(content=head)
+            self._parts.append(head)
+            self._message = await self.ctx.send(self._pending[:_MESSAGE_LIMIT] or "…", suppress_embeds=True)
+            self._rolled_over = True
+            self._last_edit = asyncio.get_running_loop().time()
+
+        now = asyncio.get_running_loop().time()
+        if now - self._last_edit >= _STREAM_EDIT_INTERVAL:
+            await self._message.edit(content=self._pending)
+            self._last_edit = now
+
+    async def reset(self):
+        """
+        Drop text that has not yet rolled over.
+
+        Used when the model's text turns out to be a preamble to a tool call
+        rather than the final answer.
+        """
+        if self._pending:
+            self._pending = ""
+            await self._message.edit(content=self._placeholder or "…")
+
+    async def finish(self) -> str:
+        """Flush the last message and return the full streamed text."""
+        if self._pending or self._rolled_over:
+            await self._message.edit(content=self._pending or "…")
+        return self.text
+
+
+async def _stream_agent_reply(agent_graph, content: str, stream: _ResponseStream) -> str:
+    """
+    Run the agent on ``content`` and stream the model's answer into Discord.
+
+    Returns the final answer text (empty if the model produced none).
+    """
+    async for chunk, metadata in agent_graph.astream(
+        {"messages": [{"role": "user", "content": content}]},
+        stream_mode="messages"
+    ):
+        if chunk.type == "tool":
+            # Whatever the model said before calling a tool is not the answer
+            await stream.reset()
+        elif chunk.type in ("ai", "AIMessageChunk") and metadata.get("langgraph_node") == "model":
+            # Tokens of LLM calls made inside tools (e.g. summarize_with_citations)
+            # are streamed too, tagged with the "tools" node; they are not the answer
+            await stream.feed(chunk.text)
+    return await stream.finish()
+
+
+class ResearchBot(commands.Bot):
+    """Discord bot for research assistance with per-user PDF management."""
+
+    def __init__(self):
+        # Set up intents
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.messages = True
+
+        super().__init__(
+            command_prefix="!",
+            intents=intents,
+            help_command=None,  # We'll create our own help command
+            # Answers quote paper text and user input; never ping anyone
+            allowed_mentions=discord.AllowedMentions.none()
+        )
+
+        self.settings = Settings()
+        self.store_manager = UserStoreManager()
+        self.conversation_manager = ConversationManager()
+        self.citation_manager = CitationManager()
+        self.summarizer = DocumentSummarizer()
+
+        # Agents per (kind, user_id), least recently used evicted first
+        self._llm = None
+        self._agent_cache = OrderedDict()
+        self._prewarmed = False
+
+        # In-flight !ask runs per (user_id, question digest)
+        self._inflight = {}
+
+        # Caps on concurrent outgoing work, so bursts queue here instead of
+        # turning into provider 429s and retry backoffs
+        self.llm_slots = asyncio.Semaphore(_MAX_CONCURRENT_LLM_RUNS)
+        self.search_slots = asyncio.Semaphore(_MAX_CONCURRENT_SEARCHES)
+
+        # Separate thread pools, so long PDF indexing / summary jobs never
+        # hold the threads that interactive searches need, and vice versa
+        self.index_executor = ThreadPoolExecutor(max_workers=_INDEX_WORKERS, thread_name_prefix="index")
+        self.io_executor = ThreadPoolExecutor(max_workers=_IO_WORKERS, thread_name_prefix="io")
+
+        # HTTP session for downloading attachments; opened in setup_hook
+        self.download_session = None
+
+    async def close(self):
+        """Shut down the worker pools along with the Discord connection."""
+        await super().close()
+        if self.download_session is not None:
+            await self.download_session.close()
+        self.index_executor.shutdown(wait=False, cancel_futures=True)
+        self.io_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def setup_hook(self):
+        """Open the download session and register the slash versions of the commands."""
+        self.download_session = aiohttp.ClientSession()
+        try:
+            synced = await self.tree.sync()
+            log.info(f"Synced {len(synced)} slash command(s)")
+        except discord.HTTPException as e:
+            log.warning(f"Could not sync slash commands: {e}")
+
+    async def on_ready(self):
+        """Called when bot is ready."""
+        log.info(f"Bot logged in as {self.user.name} (ID: {self.user.id})")
+        log.info(f"Connected to {len(self.guilds)} guild(s)")
+
+        # on_ready fires again after reconnects; warm up only once
+        if not self._prewarmed:
+            self._prewarmed = True
+            loop = asyncio.get_event_loop()
+            try:
+                await loop.run_in_executor(self.io_executor, self._prewarm)
+            except Exception as e:
+                log.warning(f"Agent warm-up failed: {e}")
+
+    def _prewarm(self):
+        """
+        Pay the agent stack's one-off costs (imports, chat client, first graph
+        build) at startup rather than on the first user's question.
+
+        The throwaway agent is not cached, so no user slot is taken.
+        """
+        from langchain.agents import create_agent
+        from agent.tools_discord import create_user_tools
+
+        create_agent(
+            model=self.llm,
+            tools=create_user_tools("__warmup__"),
+            system_prompt=_ASK_SYSTEM_PROMPT
+        )
+        log.info("Agent stack warmed up")
+
+    @property
+    def llm(self):
+        """Chat model shared by every user's agents (model and temperature are fixed)."""
+        if self._llm is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            self._llm = ChatGoogleGenerativeAI(model=self.settings.llm_model, temperature=0)
+        return self._llm
+
+    def _get_agent(self, kind: str, user_id: str, system_prompt: str):
+        """
+        Return the user's agent of the given kind, building it on first use.
+
+        Agents keep no per-conversation state (every call passes its own
+        messages) and the user's tools look up the index on each call, so a
+        built agent stays valid as the user's library changes.
+        """
+        key = (kind, user_id)
+        agent_graph = self._agent_cache.get(key)
+        if agent_graph is not None:
+            self._agent_cache.move_to_end(key)
+            return agent_graph
+
+        from langchain.agents import create_agent
+        from agent.tools_discord import create_user_tools
+
+        agent_graph = create_agent(
+            model=self.llm,
+            tools=create_user_tools(user_id),
+            system_prompt=system_prompt
         )
+        self._agent_cache[key] = agent_graph
+        if len(self._agent_cache) > _AGENT_CACHE_SIZE:
+            self._agent_cache.popitem(last=False)
+        return agent_graph
+
+    def _build_agent_for_user(self, user_id: str):
+        """Build (or reuse) a LangChain agent for a specific user using LangChain 1.0+ API."""
+        return self._get_agent("ask", user_id, _ASK_SYSTEM_PROMPT)
+
+    def _build_general_agent_for_user(self, user_id: str):
+        """Build (or reuse) a general-purpose LangChain agent that intelligently searches both local and external sources."""
+        return self._get_agent("general", user_id, _GENERAL_SYSTEM_PROMPT)
+
+    async def _download_attachment(self, attachment: discord.Attachment, fp):
+        """
+        Stream an attachment into a binary file object.
+
+        Unlike ``Attachment.save``, which reads the whole file into memory
+        first, at most ``_DOWNLOAD_CHUNK_SIZE`` bytes are held at a time, and
+        the file writes run on ``io_executor`` rather than the event loop.
+        """
+        loop = asyncio.get_event_loop()
+        async with self.download_session.get(attachment.url) as response:
+            response.raise_for_status()
+            async for piece in response.content.iter_chunked(_DOWNLOAD_CHUNK_SIZE):
+                await loop.run_in_executor(self.io_executor, fp.write, piece)
 
     async def process_pdf_upload(self, message: discord.Message, attachment: discord.Attachment):
-        """Process a PDF attachment from a user."""
+        """Process a PDF attachment from a user (the caller has checked the extension)."""
         user_id = str(message.author.id)
 
-        if not attachment.filename.lower().endswith('.pdf'):
-            return
-
         try:
-            # Download PDF
-            pdf_bytes = await attachment.read()
-
-            # Save PDF
-            pdf_path = self.store_manager.save_pdf(
-                user_id,
-                pdf_bytes,
-                attachment.filename
-            )
+            # Download PDF straight to disk, then move it into the library
+            loop = asyncio.get_event_loop()
+            tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+            try:
+                with tmp:
+                    await self._download_attachment(attachment, tmp)
+
+                # Save PDF (a copy, not a rename, if the temp dir is on another filesystem)
+                pdf_path = await loop.run_in_executor(
+                    self.io_executor,
+                    self.store_manager.move_pdf,
+                    user_id,
+                    tmp.name,
+                    attachment.filename
+                )
+            finally:
+                if os.path.exists(tmp.name):
+                    os.unlink(tmp.name)
 
             await message.add_reaction("📄")  # React to show we received it
 
             # Send processing message
             processing_msg = await message.reply(
-                f"📚 Processing **{attachment.filename}**... This may take a moment."
-            )
-
-            # Build index
-            loop = asyncio.get_event_loop()
-            num_chunks = await loop.run_in_executor(
-                None,
-                self.store_manager.build_user_index,
-                user_id
+                f"📚 Indexing and summarizing **{attachment.filename}**... This may take a moment."
             )
 
-            # Generate summary
-            await processing_msg.edit(
-                content=f"📚 Generating summary for **{attachment.filename}**..."
-            )
-
-            summary = await loop.run_in_executor(
-                None,
-                self.summarizer.generate_summary,
-                pdf_path
-            )
+            # Build index and generate summary side by side; they only share
+            # the PDF on disk (one writes the vector index, the other the
+            # summary store)
+            async with self.llm_slots:
+                num_chunks, summary = await asyncio.gather(
+                    loop.run_in_executor(self.index_executor, self.store_manager.build_user_index, user_id),
+                    loop.run_in_executor(self.index_executor, self.summarizer.generate_summary, pdf_path)
+                )
 
             # Get stats
             stats = self.store_manager.get_user_stats(user_id)
@@ -175,9 +431,13 @@ Your goal is to provide the best answer by intelligently combining local and ext
         if message.author.bot:
             return
 
-        # Check for PDF attachments
+        # Check for PDF attachments. Each upload rebuilds the user's index;
+        # overlapping builds for one user (e.g. uploads in separate messages)
+        # are serialised by UserStoreManager.build_user_index. Attachments of
+        # one message are handled in order, so their replies arrive in order
+        # and a waiting build doesn't tie up an index_executor thread.
         for attachment in message.attachments:
-            if attachment.filename.lower().endswith('.pdf'):
+            if os.path.splitext(attachment.filename)[1].lower() == ".pdf":
                 await self.process_pdf_upload(message, attachment)
 
         # Process commands
@@ -211,6 +471,11 @@ Your goal is to provide the best answer by intelligently combining local and ext
                 f"Usage: `{ctx.prefix}{ctx.command.name} {ctx.command.signature}`\n"
                 f"Type `!help` for more information."
             )
+        elif isinstance(error, commands.CommandOnCooldown):
+            await ctx.reply(
+                f"⏳ **Slow down a little**: you're sending requests too quickly.\n\n"
+                f"Try again in {error.retry_after:.0f} seconds."
+            )
         elif isinstance(error, commands.BadArgument):
             await ctx.reply(
                 f"❌ **Invalid argument**: {str(error)}\n\n"
@@ -228,7 +493,8 @@ Your goal is to provide the best answer by intelligently combining local and ext
 def setup_commands(bot: ResearchBot):
     """Set up bot commands."""
 
-    @bot.command(name="ask")
+    @bot.hybrid_command(name="ask")
+    @commands.cooldown(_USER_COMMAND_RATE, _USER_COMMAND_PER, commands.BucketType.user)
     async def ask_question(ctx: commands.Context, *, question: str):
         """
         Ask a question about your uploaded PDFs or search for papers.
@@ -239,8 +505,9 @@ def setup_commands(bot: ResearchBot):
         user_id = str(ctx.author.id)
 
         try:
-            # Validate input
-            if not question or question.strip() == "":
+            # Validate input before any I/O
+            question = question.strip()
+            if not question:
                 await ctx.reply(
                     "❌ **Empty question detected**\n\n"
                     "Please provide a question.\n"
@@ -249,7 +516,7 @@ def setup_commands(bot: ResearchBot):
                 return
 
             # Check if query is too short (less than 3 characters)
-            if len(question.strip()) < 3:
+            if len(question) < 3:
                 await ctx.reply(
                     "❌ **Question too short**\n\n"
                     "Please provide a more detailed question.\n"
@@ -257,71 +524,76 @@ def setup_commands(bot: ResearchBot):
                 )
                 return
 
-            # Check if user has PDFs
-            stats = bot.store_manager.get_user_stats(user_id)
+            if len(question) > _MAX_QUESTION_LENGTH:
+                await ctx.reply(
+                    f"❌ **Question too long**\n\n"
+                    f"Please keep questions under {_MAX_QUESTION_LENGTH} characters."
+                )
+                return
 
             # Send thinking message
-            thinking_msg = await ctx.reply("🤔 Thinking...")
-
-            # Build agent and run
-            agent_graph = bot._build_agent_for_user(user_id)
+            thinking_msg = await ctx.reply("🤔 Thinking...", suppress_embeds=True)
+
+            # The same question from the same user is already being answered
+            # (retries, double submits): wait for that run instead of
+            # starting another
+            key = (user_id, hashlib.blake2b(question.encode("utf-8"), digest_size=16).digest())
+            pending = bot._inflight.get(key)
+            if pending is not None:
+                response = await asyncio.shield(pending)
+                if not response:
+                    await thinking_msg.edit(content="❌ I couldn't generate a response. Please try rephrasing your question.")
+                    return
+                await _send_chunked(ctx, response, edit_target=thinking_msg)
+                return
 
-            # Invoke with messages format
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                agent_graph.invoke,
-                {"messages": [{"role": "user", "content": question}]}
-            )
+            future = asyncio.get_running_loop().create_future()
+            bot._inflight[key] = future
+            try:
+                # A rephrasing of an earlier question over the same PDFs gets
+                # the earlier answer without running the agent
+                loop = asyncio.get_event_loop()
+                response, remember = await loop.run_in_executor(
+                    bot.io_executor, bot.store_manager.get_cached_answer, user_id, question
+                )
+                if response is not None:
+                    await _send_chunked(ctx, response, edit_target=thinking_msg)
+                else:
+                    # Build agent and run
+                    agent_graph = bot._build_agent_for_user(user_id)
+
+                    # Stream the answer into the thinking message as it is generated
+                    # (rolling over to new messages past Discord's length limit)
+                    async with bot.llm_slots:
+                        response = await _stream_agent_reply(
+                            agent_graph, question, _ResponseStream(ctx, thinking_msg)
+                        )
+                    if response:
+                        remember(response)
+                future.set_result(response)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved in case nobody else is waiting
+                raise
+            finally:
+                del bot._inflight[key]
 
-            # Extract the final AI message
-            messages = result.get("messages", [])
-            response = ""
-            if messages:
-                # Get the last AI message
-                for msg in reversed(messages):
-                    if hasattr(msg, 'content') and hasattr(msg, 'type') and msg.type == 'ai':
-                        content = msg.content
-                        # Handle structured content (list of content blocks)
-                        if isinstance(content, list):
-                            text_parts = []
-                            for block in content:
-                                if isinstance(block, dict) and 'text' in block:
-                                    text_parts.append(block['text'])
-                                elif isinstance(block, str):
-                                    text_parts.append(block)
-                            response = '\n'.join(text_parts)
-                        elif isinstance(content, str):
-                            response = content
-                        else:
-                            response = str(content)
-                        break
-                if not response and hasattr(messages[-1], 'content'):
-                    content = messages[-1].content
-                    if isinstance(content, str):
-                        response = content
-                    else:
-                        response = str(content)
             if not response:
-                response = str(result)
+                await thinking_msg.edit(content="❌ I couldn't generate a response. Please try rephrasing your question.")
+                return
 
             # Save conversation
             bot.conversation_manager.add_conversation(user_id, question, response)
 
-            # Split response if too long (Discord limit is 2000 chars)
-            if len(response) > 1900:
-                chunks = [response[i:i+1900] for i in range(0, len(response), 1900)]
-                await thinking_msg.edit(content=chunks[0])
-                for chunk in chunks[1:]:
-                    await ctx.send(chunk)
-            else:
-                await thinking_msg.edit(content=response)
-
         except Exception as e:
             log.error(f"Error processing question for user {user_id}: {e}", exc_info=True)
             await ctx.reply(f"❌ Error: {str(e)}")
 
-    @bot.command(name="general")
+    @bot.hybrid_command(name="general")
+    @commands.cooldown(_USER_COMMAND_RATE, _USER_COMMAND_PER, commands.BucketType.user)
     async def general_query(ctx: commands.Context, *, query: str):
         """
         General-purpose query that intelligently searches both local PDFs and external sources.
@@ -342,8 +614,9 @@ def setup_commands(bot: ResearchBot):
         user_id = str(ctx.author.id)
 
         try:
-            # Validate input
-            if not query or query.strip() == "":
+            # Validate input before any I/O
+            query = query.strip()
+            if not query:
                 await ctx.reply(
                     "❌ **Empty query detected**\n\n"
                     "Please provide a question or request.\n"
@@ -352,7 +625,7 @@ def setup_commands(bot: ResearchBot):
                 return
 
             # Check if query is too short (less than 3 characters)
-            if len(query.strip()) < 3:
+            if len(query) < 3:
                 await ctx.reply(
                     "❌ **Query too short**\n\n"
                     "Please provide a more detailed question.\n"
@@ -360,6 +633,13 @@ def setup_commands(bot: ResearchBot):
                 )
                 return
 
+            if len(query) > _MAX_QUESTION_LENGTH:
+                await ctx.reply(
+                    f"❌ **Query too long**\n\n"
+                    f"Please keep queries under {_MAX_QUESTION_LENGTH} characters."
+                )
+                return
+
             # Intent detection - route to specific commands if detected
             # This allows natural language commands via !general
             query_lower = query.lower().strip()
@@ -403,49 +683,17 @@ def setup_commands(bot: ResearchBot):
                 return
 
             # Send thinking message
-            thinking_msg = await ctx.reply("🤔 Analyzing your request...")
+            thinking_msg = await ctx.reply("🤔 Analyzing your request...", suppress_embeds=True)
 
             # Build general agent and run
             agent_graph = bot._build_general_agent_for_user(user_id)
 
-            # Invoke with messages format
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                agent_graph.invoke,
-                {"messages": [{"role": "user", "content": query}]}
-            )
-
-            # Extract the final AI message
-            messages = result.get("messages", [])
-            response = ""
-            if messages:
-                # Get the last AI message
-                for msg in reversed(messages):
-                    if hasattr(msg, 'content') and hasattr(msg, 'type') and msg.type == 'ai':
-                        content = msg.content
-                        # Handle structured content (list of content blocks)
-                        if isinstance(content, list):
-                            text_parts = []
-                            for block in content:
-                                if isinstance(block, dict) and 'text' in block:
-                                    text_parts.append(block['text'])
-                                elif isinstance(block, str):
-                                    text_parts.append(block)
-                            response = '\n'.join(text_parts)
-                        elif isinstance(content, str):
-                            response = content
-                        else:
-                            response = str(content)
-                        break
-                if not response and hasattr(messages[-1], 'content'):
-                    content = messages[-1].content
-                    if isinstance(content, str):
-                        response = content
-                    else:
-                        response = str(content)
-            if not response:
-                response = str(result)
+            # Stream the answer into the thinking message as it is generated
+            # (rolling over to new messages past Discord's length limit)
+            async with bot.llm_slots:
+                response = await _stream_agent_reply(
+                    agent_graph, query, _ResponseStream(ctx, thinking_msg)
+                )
 
             # Check if response is empty or indicates agent couldn't understand
             if not response or response.strip() == "":
@@ -487,18 +735,9 @@ def setup_commands(bot: ResearchBot):
                 )
                 return
 
-            # Save conversation
+            # Save conversation (the answer itself has already been streamed)
             bot.conversation_manager.add_conversation(user_id, query, response)
 
-            # Split response if too long (Discord limit is 2000 chars)
-            if len(response) > 1900:
-                chunks = [response[i:i+1900] for i in range(0, len(response), 1900)]
-                await thinking_msg.edit(content=chunks[0])
-                for chunk in chunks[1:]:
-                    await ctx.send(chunk)
-            else:
-                await thinking_msg.edit(content=response)
-
         except Exception as e:
             log.error(f"Error processing general query for user {user_id}: {e}", exc_info=True)
             await ctx.reply(
@@ -512,7 +751,8 @@ def setup_commands(bot: ResearchBot):
                 f"Type `!help` for more information."
             )
 
-    @bot.command(name="search")
+    @bot.hybrid_command(name="search")
+    @commands.cooldown(_USER_COMMAND_RATE, _USER_COMMAND_PER, commands.BucketType.user)
     async def search_papers(ctx: commands.Context, *, query: str):
         """
         Search for academic papers on Semantic Scholar, arXiv, and Google.
@@ -521,8 +761,9 @@ def setup_commands(bot: ResearchBot):
         Example: !search transformer attention mechanisms
         """
         try:
-            # Validate input
-            if not query or query.strip() == "":
+            # Validate input before any I/O
+            query = query.strip()
+            if not query:
                 await ctx.reply(
                     "❌ **Empty search query**\n\n"
                     "Please provide a search query.\n"
@@ -530,7 +771,7 @@ def setup_commands(bot: ResearchBot):
                 )
                 return
 
-            if len(query.strip()) < 3:
+            if len(query) < 3:
                 await ctx.reply(
                     "❌ **Search query too short**\n\n"
                     "Please provide a more detailed search query.\n"
@@ -538,31 +779,27 @@ def setup_commands(bot: ResearchBot):
                 )
                 return
 
-            thinking_msg = await ctx.reply("🔍 Searching academic databases...")
+            thinking_msg = await ctx.reply("🔍 Searching academic databases...", suppress_embeds=True)
 
             # Search papers using non-decorated function
             # Run in executor to avoid blocking
+            from agent.search_tools import search_papers as search_papers_tool  # Alias avoids the command name
             loop = asyncio.get_event_loop()
-            results = await loop.run_in_executor(None, search_papers_tool, query)
+            async with bot.search_slots:
+                results = await loop.run_in_executor(bot.io_executor, search_papers_tool, query)
 
             # Ensure results is a string
             if not isinstance(results, str):
                 results = str(results)
 
             # Split if needed
-            if len(results) > 1900:
-                chunks = [results[i:i+1900] for i in range(0, len(results), 1900)]
-                await thinking_msg.edit(content=chunks[0])
-                for chunk in chunks[1:]:
-                    await ctx.send(chunk)
-            else:
-                await thinking_msg.edit(content=results)
+            await _send_chunked(ctx, results, edit_target=thinking_msg)
 
         except Exception as e:
             log.error(f"Error searching papers: {e}", exc_info=True)
             await ctx.reply(f"❌ Error: {str(e)}")
 
-    @bot.command(name="stats")
+    @bot.hybrid_command(name="stats")
     async def show_stats(ctx: commands.Context):
         """
         Show your library statistics.
@@ -581,14 +818,13 @@ def setup_commands(bot: ResearchBot):
                 )
                 return
 
-            pdfs_list = "\n".join(f"  • {name}" for name in stats['pdf_names'])
 
             message = (
                 f"📊 **Your Library Stats**\n\n"
                 f"📄 PDFs: {stats['pdf_count']}\n"
                 f"💾 Total size: {stats['total_size_mb']} MB\n"
                 f"🔍 Indexed: {'✅ Yes' if stats['has_index'] else '❌ No'}\n\n"
-                f"**Your PDFs:**\n{pdfs_list}"
+                f"**Your PDFs:**\n{stats['pdf_list_text']}"
             )
 
             await ctx.reply(message)
@@ -597,7 +833,7 @@ def setup_commands(bot: ResearchBot):
             log.error(f"Error getting stats: {e}", exc_info=True)
             await ctx.reply(f"❌ Error: {str(e)}")
 
-    @bot.command(name="clear")
+    @bot.hybrid_command(name="clear")
     async def clear_library(ctx: commands.Context):
         """
         Clear all your uploaded PDFs and index.
@@ -612,20 +848,23 @@ def setup_commands(bot: ResearchBot):
                 "⚠️ **Warning**: This will delete all your uploaded PDFs and index.\n"
                 "React with ✅ to confirm or ❌ to cancel."
             )
-            await confirm_msg.add_reaction("✅")
-            await confirm_msg.add_reaction("❌")
+            await asyncio.gather(
+                confirm_msg.add_reaction("✅"),
+                confirm_msg.add_reaction("❌")
+            )
 
-            def check(reaction, user):
+            # Raw events fire even when the message or member is not cached
+            def check(payload: discord.RawReactionActionEvent):
                 return (
-                    user == ctx.author and
-                    str(reaction.emoji) in ["✅", "❌"] and
-                    reaction.message.id == confirm_msg.id
+                    payload.user_id == ctx.author.id and
+                    payload.message_id == confirm_msg.id and
+                    str(payload.emoji) in ["✅", "❌"]
                 )
 
             try:
-                reaction, user = await bot.wait_for("reaction_add", timeout=30.0, check=check)
+                payload = await bot.wait_for("raw_reaction_add", timeout=30.0, check=check)
 
-                if str(reaction.emoji) == "✅":
+                if str(payload.emoji) == "✅":
                     success = bot.store_manager.clear_user_data(user_id)
                     if success:
                         await ctx.send("🗑️ Your library has been cleared.")
@@ -641,7 +880,7 @@ def setup_commands(bot: ResearchBot):
             log.error(f"Error clearing library: {e}", exc_info=True)
             await ctx.reply(f"❌ Error: {str(e)}")
 
-    @bot.command(name="history")
+    @bot.hybrid_command(name="history")
     async def show_history(ctx: commands.Context, limit: int = 10):
         """
         Show your conversation history.
@@ -655,19 +894,14 @@ def setup_commands(bot: ResearchBot):
             history_text = bot.conversation_manager.format_history(user_id, limit=limit)
 
             # Split if too long
-            if len(history_text) > 1900:
-                chunks = [history_text[i:i+1900] for i in range(0, len(history_text), 1900)]
-                await ctx.reply(chunks[0])
-                for chunk in chunks[1:]:
-                    await ctx.send(chunk)
-            else:
-                await ctx.reply(history_text)
+            await _send_chunked(ctx, history_text)
 
         except Exception as e:
             log.error(f"Error showing history: {e}", exc_info=True)
             await ctx.reply(f"❌ Error: {str(e)}")
 
-    @bot.command(name="summarize")
+    @bot.hybrid_command(name="summarize")
+    @commands.cooldown(_USER_COMMAND_RATE, _USER_COMMAND_PER, commands.BucketType.user)
     async def summarize_pdf(ctx: commands.Context, *, pdf_name: Optional[str] = None):
         """
         Get a summary of a specific PDF or the most recent one.
@@ -678,14 +912,14 @@ def setup_commands(bot: ResearchBot):
         user_id = str(ctx.author.id)
 
         try:
+            pdf_name = pdf_name.strip() if pdf_name else None
+            if pdf_name and ("/" in pdf_name or "\\" in pdf_name):
+                await ctx.reply("❌ Please give just the PDF's file name, without folders. Use `!stats` to see your PDFs.")
+                return
+
             if pdf_name:
                 # Find specific PDF
-                pdfs = bot.store_manager.get_user_pdfs(user_id)
-                matching_pdf = None
-                for pdf in pdfs:
-                    if pdf_name.lower() in pdf.lower():
-                        matching_pdf = pdf
-                        break
+                matching_pdf = bot.store_manager.find_user_pdf(user_id, pdf_name)
 
                 if not matching_pdf:
                     await ctx.reply(f"❌ PDF '{pdf_name}' not found. Use `!stats` to see your PDFs.")
@@ -694,11 +928,11 @@ def setup_commands(bot: ResearchBot):
                 pdf_path = matching_pdf
             else:
                 # Use most recent PDF
-                pdfs = bot.store_manager.get_user_pdfs(user_id)
+                pdfs = bot.store_manager.get_user_pdfs_with_mtime(user_id)
                 if not pdfs:
                     await ctx.reply("❌ No PDFs uploaded yet.")
                     return
-                pdf_path = max(pdfs, key=os.path.getmtime)
+                pdf_path = max(pdfs, key=itemgetter(1))[0]
 
             # Check if summary exists
             summary = bot.summarizer.get_summary(os.path.basename(pdf_path))
@@ -707,29 +941,24 @@ def setup_commands(bot: ResearchBot):
                 # Generate new summary
                 thinking_msg = await ctx.reply("📝 Generating summary...")
                 loop = asyncio.get_event_loop()
-                summary = await loop.run_in_executor(
-                    None,
-                    bot.summarizer.generate_summary,
-                    pdf_path
-                )
+                async with bot.llm_slots:
+                    summary = await loop.run_in_executor(
+                        bot.index_executor,
+                        bot.summarizer.generate_summary,
+                        pdf_path
+                    )
                 await thinking_msg.delete()
 
             # Format and send
             summary_text = bot.summarizer.format_summary_for_display(summary)
 
-            if len(summary_text) > 1900:
-                chunks = [summary_text[i:i+1900] for i in range(0, len(summary_text), 1900)]
-                await ctx.reply(chunks[0])
-                for chunk in chunks[1:]:
-                    await ctx.send(chunk)
-            else:
-                await ctx.reply(summary_text)
+            await _send_chunked(ctx, summary_text)
 
         except Exception as e:
             log.error(f"Error summarizing PDF: {e}", exc_info=True)
             await ctx.reply(f"❌ Error: {str(e)}")
 
-    @bot.command(name="cite")
+    @bot.hybrid_command(name="cite")
     async def export_citations(ctx: commands.Context, format_type: str = "apa"):
         """
         Export citations from your recent searches in various formats.
@@ -749,7 +978,7 @@ def setup_commands(bot: ResearchBot):
                 return
 
             # Extract citations from history
-            all_text = "\n".join([conv.get('answer', '') for conv in history])
+            all_text = "\n".join(conv.get('answer', '') for conv in history)
             citations = bot.citation_manager.extract_from_text(all_text)
 
             if not citations:
@@ -760,19 +989,17 @@ def setup_commands(bot: ResearchBot):
             bibliography = bot.citation_manager.format_bibliography(citations, format_type)
 
             # Split if needed
-            if len(bibliography) > 1900:
-                chunks = [bibliography[i:i+1900] for i in range(0, len(bibliography), 1900)]
-                await ctx.reply(f"📚 **Bibliography ({format_type.upper()})**:\n\n{chunks[0]}")
-                for chunk in chunks[1:]:
-                    await ctx.send(chunk)
-            else:
-                await ctx.reply(f"📚 **Bibliography ({format_type.upper()})**:\n\n{bibliography}")
+            await _send_chunked(
+                ctx, bibliography,
+                prefix=f"📚 **Bibliography ({format_type.upper()})**:\n\n"
+            )
 
         except Exception as e:
             log.error(f"Error exporting citations: {e}", exc_info=True)
             await ctx.reply(f"❌ Error: {str(e)}")
 
-    @bot.command(name="fsearch")
+    @bot.hybrid_command(name="fsearch")
+    @commands.cooldown(_USER_COMMAND_RATE, _USER_COMMAND_PER, commands.BucketType.user)
     async def free_search(ctx: commands.Context, *, args: str):
         """
         Enhanced free search with filters (OpenAlex, CrossRef, PubMed, arXiv).
@@ -791,64 +1018,50 @@ def setup_commands(bot: ResearchBot):
                 )
                 return
 
-            # Parse arguments
-            import shlex
-            parts = shlex.split(args)
-
-            query = []
-            year_from = None
-            year_to = None
-            author = None
-
-            i = 0
-            while i < len(parts):
-                if parts[i] == "--year-from" and i + 1 < len(parts):
-                    year_from = int(parts[i + 1])
-                    i += 2
-                elif parts[i] == "--year-to" and i + 1 < len(parts):
-                    year_to = int(parts[i + 1])
-                    i += 2
-                elif parts[i] == "--author" and i + 1 < len(parts):
-                    author = parts[i + 1]
-                    i += 2
-                else:
-                    query.append(parts[i])
-                    i += 1
+            # Parse arguments (flags may appear anywhere; unknown dashed words
+            # such as "-omics" stay part of the query)
+            try:
+                parsed, extra = _FSEARCH_PARSER.parse_known_intermixed_args(shlex.split(args))
+            except ValueError as e:
+                await ctx.reply(
+                    f"❌ **Invalid search options**: {e}\n\n"
+                    f"Usage: `!fsearch <query> [--year-from YYYY] [--year-to YYYY] [--author \"Name\"]`"
+                )
+                return
 
-            query_str = " ".join(query)
+            query_str = " ".join(parsed.query + extra)
+            year_from = parsed.year_from
+            year_to = parsed.year_to
+            author = parsed.author
 
             if not query_str:
                 await ctx.reply("❌ Please provide a search query.")
                 return
 
-            thinking_msg = await ctx.reply("🔍 Searching free academic databases...")
+            thinking_msg = await ctx.reply("🔍 Searching free academic databases...", suppress_embeds=True)
 
             # Search using enhanced search
+            from agent.search_tools_enhanced import search_academic_papers_enhanced
             loop = asyncio.get_event_loop()
-            results = await loop.run_in_executor(
-                None,
-                search_academic_papers_enhanced,
-                query_str,
-                ['openalex', 'crossref', 'pubmed', 'arxiv'],  # sources
-                year_from,
-                year_to,
-                author
-            )
+            async with bot.search_slots:
+                results = await loop.run_in_executor(
+                    bot.io_executor,
+                    search_academic_papers_enhanced,
+                    query_str,
+                    ['openalex', 'crossref', 'pubmed', 'arxiv'],  # sources
+                    year_from,
+                    year_to,
+                    author
+                )
 
             # Split if needed
-            if len(results) > 1900:
-                chunks = [results[i:i+1900] for i in range(0, len(results), 1900)]
-                await thinking_msg.edit(content=chunks[0])
-                for chunk in chunks[1:]:
-                    await ctx.send(chunk)
-            else:
-                await thinking_msg.edit(content=results)
+            await _send_chunked(ctx, results, edit_target=thinking_msg)
 
         except Exception as e:
             log.error(f"Error in free search: {e}", exc_info=True)
             await ctx.reply(f"❌ Error: {str(e)}")
 
-    @bot.command(name="help")
+    @bot.hybrid_command(name="help")
     async def show_help(ctx: commands.Context):
         """Show help message."""
         help_text = """
@@ -858,6 +1071,7 @@ def setup_commands(bot: ResearchBot):
 Simply attach PDF files to any message. Auto-indexed with summary!
 
 **Commands:**
+Every command below also works as a slash command (e.g. `/ask`).
 
 `!general <query>` ⭐ NEW!
 Smart query that automatically searches your PDFs first, then external sources if needed.
@@ -39,7 +39,7 @@ def main():
         return
 
     print("\nRe-indexing PDFs...")
-    num_chunks = manager.build_user_index(user_id)
+    num_chunks = manager.build_user_index(user_id, force=True)
 
     print(f"\n✅ Successfully indexed {num_chunks} chunks!")
 
@@ -0,0 +1,136 @@
+"""Tests for conversation manager."""
+import tempfile
+import shutil
+import pytest
+
+from agent.conversation_manager import ConversationManager
+
+
+@pytest.fixture
+def temp_conv_dir():
+    """Create a temporary directory for testing."""
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    # Cleanup
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def conv_manager(temp_conv_dir):
+    """Create a ConversationManager instance for testing."""
+    return ConversationManager(base_dir=temp_conv_dir)
+
+
+def test_add_and_get_history(conv_manager):
+    """Test saving and loading conversations."""
+    user_id = "test_user_history"
+
+    conv_manager.add_conversation(user_id, "What is RAG?", "Retrieval-augmented generation.")
+    conv_manager.add_conversation(user_id, "What is BM25?", "A ranking function.", ["a.pdf"])
+
+    history = conv_manager.get_history(user_id)
+    assert len(history) == 2
+    assert history[0]["question"] == "What is RAG?"
+    assert history[1]["sources"] == ["a.pdf"]
+
+    assert len(conv_manager.get_history(user_id, limit=1)) == 1
+
+
+def test_search_history_case_insensitive(conv_manager):
+    """Test that search matches questions and answers regardless of case."""
+    user_id = "test_user_search"
+
+    conv_manager.add_conversation(user_id, "Explain Transformers", "Attention is all you need.")
+    conv_manager.add_conversation(user_id, "What is BM25?", "A ranking function.")
+
+    assert len(conv_manager.search_history(user_id, "transformers")) == 1
+    assert len(conv_manager.search_history(user_id, "ATTENTION")) == 1
+    assert len(conv_manager.search_history(user_id, "nothing here")) == 0
+
+
+def test_search_history_escapes_query(conv_manager):
+    """Test that regex metacharacters in the query are matched literally."""
+    user_id = "test_user_escape"
+
+    conv_manager.add_conversation(user_id, "What is C++?", "A programming language.")
+    conv_manager.add_conversation(user_id, "What is C?", "Another language.")
+
+    matches = conv_manager.search_history(user_id, "c++")
+    assert len(matches) == 1
+    assert matches[0]["question"] == "What is C++?"
+
+
+def test_clear_history(conv_manager):
+    """Test clearing conversation history."""
+    user_id = "test_user_clear_history"
+
+    conv_manager.add_conversation(user_id, "Question", "Answer")
+    assert conv_manager.clear_history(user_id) is True
+    assert conv_manager.get_history(user_id) == []
+    assert conv_manager.clear_history(user_id) is False
+
+
+def test_recent_context_and_format_history(conv_manager):
+    """Test the text layout of recent context and formatted history."""
+    user_id = "test_user_format"
+
+    assert conv_manager.get_recent_context(user_id) == ""
+    assert conv_manager.format_history(user_id) == "No conversation history found."
+
+    conv_manager.add_conversation(user_id, "Q1", "A1")
+    conv_manager.add_conversation(user_id, "Q2", "A" * 300, ["a.pdf"])
+
+    assert conv_manager.get_recent_context(user_id) == (
+        "Q: Q1\nA: A1...\nQ: Q2\nA: " + "A" * 200 + "..."
+    )
+
+    formatted = conv_manager.format_history(user_id)
+    lines = formatted.split("\n")
+    assert lines[0] == "📜 **Your Recent Conversations** (last 2):"
+    assert lines[1] == ""
+    assert "❓ Q: Q1" in lines
+    assert "💡 A: " + "A" * 150 + "..." in lines
+    assert "📚 Sources: 1" in lines
+    assert formatted.endswith("📚 Sources: 1\n")
+
+
+def test_short_answers_precomputed(conv_manager):
+    """Test that truncated answers are stored at write time."""
+    user_id = "test_user_short"
+
+    conv_manager.add_conversation(user_id, "Q", "B" * 300)
+    conv = conv_manager.get_history(user_id)[0]
+
+    assert conv["answer_short_200"] == "B" * 200
+    assert conv["answer_short_150"] == "B" * 150 + "..."
+
+
+def test_history_tail_spans_read_blocks(conv_manager):
+    """Test that limited reads return the newest turns when entries exceed one block."""
+    user_id = "test_user_tail"
+
+    for i in range(20):
+        conv_manager.add_conversation(user_id, f"Q{i}", f"{i}" * 1000)
+
+    recent = conv_manager.get_history(user_id, limit=7)
+    assert [conv["question"] for conv in recent] == [f"Q{i}" for i in range(13, 20)]
+    assert len(conv_manager.get_history(user_id, limit=50)) == 20
+    assert len(conv_manager.get_history(user_id)) == 20
+
+
+def test_legacy_history_file_is_migrated(conv_manager, temp_conv_dir):
+    """Test that a single-document JSON history is converted to JSON Lines."""
+    import json
+    from pathlib import Path
+
+    user_id = "test_user_legacy"
+    legacy = Path(temp_conv_dir) / f"user_{user_id}.json"
+    legacy.write_text(json.dumps({
+        "user_id": user_id,
+        "conversations": [{"timestamp": "2024-01-01T00:00:00", "question": "Old", "answer": "Answer", "sources": []}],
+    }), encoding="utf-8")
+
+    conv_manager.add_conversation(user_id, "New", "Answer")
+
+    assert not legacy.exists()
+    assert [conv["question"] for conv in conv_manager.get_history(user_id)] == ["Old", "New"]
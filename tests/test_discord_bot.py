@@ -0,0 +1,67 @@
+"""Offline tests for the Discord bot's agent streaming (models are faked)."""
+import asyncio
+
+from langchain.agents import create_agent
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+
+from bot.discord_bot import _stream_agent_reply
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that returns the given replies in order."""
+
+    replies: list
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=self.replies.pop(0))])
+
+
+class FakeStream:
+    """Records what _stream_agent_reply would show in Discord."""
+
+    def __init__(self):
+        self.fed = []
+        self.resets = 0
+
+    async def feed(self, text):
+        self.fed.append(text)
+
+    async def reset(self):
+        self.resets += 1
+
+    async def finish(self):
+        return "".join(self.fed)
+
+
+def test_tool_llm_tokens_are_not_streamed():
+    """Test that tokens of an LLM call inside a tool never reach the user."""
+    inner = GenericFakeChatModel(messages=iter([AIMessage(content="inner tool summary")]))
+
+    @tool
+    def summarize(query: str) -> str:
+        """Summarize the user's PDFs."""
+        return "".join(chunk.text for chunk in inner.stream(query))
+
+    model = ScriptedChatModel(replies=[
+        AIMessage(content="", tool_calls=[{"name": "summarize", "args": {"query": "q"}, "id": "call_1"}]),
+        AIMessage(content="final answer"),
+    ])
+    agent_graph = create_agent(model=model, tools=[summarize])
+
+    stream = FakeStream()
+    answer = asyncio.run(_stream_agent_reply(agent_graph, "question", stream))
+
+    assert answer == "final answer"
+    assert "inner" not in "".join(stream.fed)
+    assert stream.resets == 1
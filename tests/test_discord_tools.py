@@ -68,3 +68,61 @@ def test_user_tools_are_callable():
     # Test search tool
     result = tools[2].run("machine learning")
     assert isinstance(result, str)
+
+
+def test_user_tools_are_reused():
+    """Test that tools are built once per user and not shared across users."""
+    first = create_user_tools("test_user_reuse")
+    first.clear()
+    second = create_user_tools("test_user_reuse")
+    other = create_user_tools("test_user_reuse_other")
+
+    assert len(second) == 3
+    assert second == create_user_tools("test_user_reuse")
+    assert second[0] is create_user_tools("test_user_reuse")[0]
+    assert other[0] is not second[0]
+
+
+def test_retrieval_is_cached_and_coalesced(monkeypatch):
+    """Test that identical queries share one retrieval until the index changes."""
+    import threading
+    import time
+    from agent import tools_discord
+
+    calls = []
+    version = [1]
+    release = threading.Event()
+
+    class FakeRetriever:
+        def invoke(self, query):
+            calls.append(query)
+            release.wait(timeout=5)
+            return [f"doc for {query}"]
+
+    monkeypatch.setattr(tools_discord.store_manager, "get_retriever", lambda user_id: FakeRetriever())
+    monkeypatch.setattr(tools_discord.store_manager, "index_version", lambda user_id: version[0])
+    monkeypatch.setattr(tools_discord, "_retrieval_cache", type(tools_discord._retrieval_cache)())
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(tools_discord._retrieve_docs("u1", "rag")))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == ["rag"]
+    assert results == [["doc for rag"]] * 4
+
+    # Served from cache
+    tools_discord._retrieve_docs("u1", "rag")
+    assert calls == ["rag"]
+
+    # Re-indexing invalidates
+    version[0] = 2
+    tools_discord._retrieve_docs("u1", "rag")
+    assert calls == ["rag", "rag"]
@@ -145,13 +145,110 @@ Department of Computer Science"""
         assert metadata['title'] == "machine learning paper"
         log.info(f"✓ Fallback title created: {metadata['title']}")
 
+    def test_metadata_cache_skips_reparse(self, tmp_path, monkeypatch):
+        """Test 13: Cached metadata is reused for unchanged PDF content."""
+        log.info("TEST 13: Testing metadata cache by file content")
+        from pypdf import PdfWriter
+        import agent.pdf_metadata as pdf_metadata
+
+        pdf_path = tmp_path / "cached_paper.pdf"
+        writer = PdfWriter()
+        writer.add_blank_page(width=612, height=792)
+        writer.add_metadata({"/Title": "Cached Title", "/Author": "John Smith, Jane Doe"})
+        with open(pdf_path, "wb") as f:
+            writer.write(f)
+
+        extractor = PDFMetadataExtractor(cache_dir=str(tmp_path / "cache"), backend="pypdf")
+        first = extractor.extract_metadata(str(pdf_path))
+        assert first['title'] == "Cached Title"
+        assert first['authors'] == ["John Smith", "Jane Doe"]
+        assert len(list((tmp_path / "cache").glob("*.json"))) == 1
+
+        # A cache hit must not touch pypdf at all
+        def fail_reader(*args, **kwargs):
+            raise AssertionError("PdfReader should not be called on a cache hit")
+        monkeypatch.setattr(pdf_metadata, "PdfReader", fail_reader)
+
+        second = extractor.extract_metadata(str(pdf_path))
+        assert second == first
+
+        # Same content under another name keeps path-specific fields current
+        copy_path = tmp_path / "copy.pdf"
+        copy_path.write_bytes(pdf_path.read_bytes())
+        copied = extractor.extract_metadata(str(copy_path))
+        assert copied['filename'] == "copy.pdf"
+        assert copied['title'] == "Cached Title"
+        log.info("✓ Metadata cache reused without re-parsing")
+
+        # A new extractor version ignores entries written by the old one
+        from pypdf import PdfReader
+        monkeypatch.setattr(pdf_metadata, "PdfReader", PdfReader)
+        monkeypatch.setattr(pdf_metadata, "_EXTRACTOR_VERSION", pdf_metadata._EXTRACTOR_VERSION + 1)
+        assert extractor.extract_metadata(str(pdf_path)) == first
+        assert len(list((tmp_path / "cache").glob("*.json"))) == 2
+
+    def test_first_page_text_budget(self, extractor, monkeypatch):
+        """Test 14: First-page extraction stops once the character budget is hit."""
+        log.info("TEST 14: Testing bounded first-page text extraction")
+        import agent.pdf_metadata as pdf_metadata
+
+        class FakePage:
+            def __init__(self, chunks):
+                self.chunks = chunks
+                self.visited = 0
+
+            def extract_text(self, visitor_text=None):
+                for chunk in self.chunks:
+                    self.visited += 1
+                    visitor_text(chunk, None, None, None, None)
+                return "".join(self.chunks) + "<full>"
+
+        monkeypatch.setattr(pdf_metadata, "_FIRST_PAGE_CHAR_BUDGET", 10)
+
+        short_page = FakePage(["abc", "def"])
+        assert extractor._extract_first_page_text(short_page) == "abcdef<full>"
+
+        long_page = FakePage(["abcd", "efgh", "ijkl", "mnop"])
+        assert extractor._extract_first_page_text(long_page) == "abcdefghijkl"
+        assert long_page.visited == 3
+        log.info("✓ Extraction stopped at the character budget")
+
+    def test_extract_metadata_batch(self, tmp_path, monkeypatch):
+        """Test 15: Batch extraction keeps input order and reuses the cache."""
+        log.info("TEST 15: Testing batch metadata extraction")
+        from pypdf import PdfWriter
+        import agent.pdf_metadata as pdf_metadata
+
+        paths = []
+        for i in range(3):
+            pdf_path = tmp_path / f"paper_{i}.pdf"
+            writer = PdfWriter()
+            writer.add_blank_page(width=612, height=792)
+            writer.add_metadata({"/Title": f"Paper {i}"})
+            with open(pdf_path, "wb") as f:
+                writer.write(f)
+            paths.append(str(pdf_path))
+
+        monkeypatch.setattr(pdf_metadata, "_extractor",
+                            PDFMetadataExtractor(cache_dir=str(tmp_path / "cache")))
+
+        results = pdf_metadata.extract_pdf_metadata_batch(paths, workers=2)
+        assert [m['title'] for m in results] == ["Paper 0", "Paper 1", "Paper 2"]
+
+        # Second run is answered entirely from the cache
+        monkeypatch.setattr(pdf_metadata, "extract_pdf_metadata",
+                            lambda *a, **kw: pytest.fail("cache miss on second batch"))
+        again = pdf_metadata.extract_pdf_metadata_batch(paths, workers=2)
+        assert again == results
+        log.info("✓ Batch extraction ordered and cached")
+
     @pytest.mark.skipif(
         not os.path.exists("store/users"),
         reason="No user PDFs available for testing"
     )
     def test_extract_from_real_pdf(self):
-        """Test 13: Extract metadata from a real PDF if available."""
-        log.info("TEST 13: Testing metadata extraction from real PDF")
+        """Test 16: Extract metadata from a real PDF if available."""
+        log.info("TEST 16: Testing metadata extraction from real PDF")
 
         # Try to find a PDF in user store
         import glob
@@ -0,0 +1,187 @@
+"""
+Offline tests for the enhanced search tools (HTTP calls are faked).
+"""
+import json
+import pytest
+import logging
+
+from agent import search_tools_enhanced
+from agent.search_tools_enhanced import (
+    CrossRefSearch,
+    OpenAlexSearch,
+    _CappedRetry,
+    _RateLimiter,
+    _TTLCache,
+)
+
+log = logging.getLogger("test_search_tools_enhanced")
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response."""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.content = json.dumps(payload).encode()
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty result caches."""
+    search_tools_enhanced._SEARCH_CACHE.clear()
+    search_tools_enhanced._AGGREGATE_CACHE.clear()
+    yield
+    search_tools_enhanced._SEARCH_CACHE.clear()
+    search_tools_enhanced._AGGREGATE_CACHE.clear()
+
+
+class TestTTLCache:
+    """Test suite for the in-process result cache."""
+
+    def test_get_set_and_expiry(self, monkeypatch):
+        """Test 1: Entries are returned until their TTL passes."""
+        now = [100.0]
+        monkeypatch.setattr(search_tools_enhanced.time, "monotonic", lambda: now[0])
+
+        cache = _TTLCache(maxsize=4, ttl=10)
+        cache.set("q", "result")
+        assert cache.get("q") == "result"
+
+        now[0] += 11
+        assert cache.get("q") is None
+
+    def test_evicts_least_recently_used(self):
+        """Test 2: The oldest unused entry is dropped past maxsize."""
+        cache = _TTLCache(maxsize=2, ttl=60)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+
+class TestRateLimiter:
+    """Test suite for the per-host token bucket."""
+
+    def test_waits_once_burst_is_spent(self, monkeypatch):
+        """Test 3: Requests beyond the burst wait 1/rate seconds each."""
+        now = [0.0]
+        sleeps = []
+        monkeypatch.setattr(search_tools_enhanced.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(search_tools_enhanced.time, "sleep", sleeps.append)
+
+        limiter = _RateLimiter(2)
+        for _ in range(4):
+            limiter.acquire()
+
+        assert sleeps == [pytest.approx(0.5), pytest.approx(1.0)]
+
+
+class TestCappedRetry:
+    """Test suite for the Retry-After cap on throttled requests."""
+
+    def test_retry_after_is_capped(self, monkeypatch):
+        """Test 4: A long Retry-After is clamped, also on retries derived from it."""
+        from urllib3.response import HTTPResponse
+        import urllib3.util.retry
+
+        sleeps = []
+        monkeypatch.setattr(urllib3.util.retry.time, "sleep", sleeps.append)
+        response = HTTPResponse(status=429, headers={"Retry-After": "600"})
+
+        retry = _CappedRetry(total=4, status_forcelist=[429], respect_retry_after_header=True)
+        retry = retry.increment(method="GET", url="/works", response=response)
+        assert isinstance(retry, _CappedRetry)
+        retry.sleep(response)
+
+        assert sleeps == [search_tools_enhanced._MAX_RETRY_AFTER]
+
+
+class TestCachedSearch:
+    """Test suite for caching of provider searches."""
+
+    def test_repeated_search_hits_cache(self, monkeypatch):
+        """Test 5: A repeated query is served without a second request."""
+        calls = []
+
+        def fake_get(url, params=None, timeout=None):
+            calls.append(params)
+            return FakeResponse({"results": [{"title": "Paper", "publication_year": 2020}]})
+
+        monkeypatch.setattr(search_tools_enhanced._SESSION, "get", fake_get)
+
+        first = OpenAlexSearch().search("graphs", limit=1)
+        second = OpenAlexSearch().search("graphs", limit=1)
+
+        assert first == second
+        assert "**Paper**" in first
+        assert len(calls) == 1
+
+        OpenAlexSearch().search("graphs", limit=1, year_from=2019)
+        assert len(calls) == 2
+
+    def test_errors_are_not_cached(self, monkeypatch):
+        """Test 6: Failed searches are retried on the next call."""
+        calls = []
+
+        def failing_get(url, params=None, timeout=None):
+            calls.append(params)
+            raise ConnectionError("boom")
+
+        monkeypatch.setattr(search_tools_enhanced._SESSION, "get", failing_get)
+
+        assert CrossRefSearch().search("graphs").startswith("Error searching CrossRef")
+        CrossRefSearch().search("graphs")
+        assert len(calls) == 2
+
+
+class TestBatchLookups:
+    """Test suite for batched DOI / ID lookups."""
+
+    def test_crossref_dois_are_chunked(self, monkeypatch):
+        """Test 7: DOIs are sent as OR-ed filters in chunks."""
+        calls = []
+
+        def fake_get(url, params=None, timeout=None):
+            calls.append(params)
+            dois = [f.split(":", 1)[1] for f in params["filter"].split(",")]
+            return FakeResponse({"message": {"items": [{"DOI": d} for d in dois]}})
+
+        monkeypatch.setattr(search_tools_enhanced._SESSION, "get", fake_get)
+
+        dois = [f"10.1000/{i}" for i in range(65)]
+        works = CrossRefSearch().get_works_by_dois(dois)
+
+        assert [w["DOI"] for w in works] == dois
+        # Chunks are fetched concurrently, so only the set of sizes is fixed
+        assert sorted(c["rows"] for c in calls) == [5, 30, 30]
+
+    def test_openalex_ids_are_chunked(self, monkeypatch):
+        """Test 8: OpenAlex IDs are pipe-joined in chunks of 50."""
+        calls = []
+
+        def fake_get(url, params=None, timeout=None):
+            calls.append(params)
+            ids = params["filter"].split(":", 1)[1].split("|")
+            return FakeResponse({"results": [{"id": i} for i in ids]})
+
+        monkeypatch.setattr(search_tools_enhanced._SESSION, "get", fake_get)
+
+        ids = [f"W{i}" for i in range(120)]
+        works = OpenAlexSearch().get_works_by_ids(ids)
+
+        assert [w["id"] for w in works] == ids
+        assert len(calls) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,108 @@
+"""Offline tests for the global-index summary tools (embeddings and LLM are faked)."""
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+from agent import tools_gemini
+from agent.config import Settings
+
+# Unit vectors: a paraphrase of "what is rag" (cosine ~0.995) and an
+# unrelated question (cosine 0.8, under the 0.92 threshold)
+_VECTORS = {
+    "what is rag": [1.0, 0.0, 0.0],
+    "what is RAG?": [0.995, 0.0998, 0.0],
+    "how are graphs stored": [0.8, 0.0, 0.6],
+}
+
+
+class FakeVectorStore:
+    """Stand-in for the Chroma store behind the global retriever."""
+
+    def __init__(self):
+        self.embeddings = SimpleNamespace(embed_query=lambda text: _VECTORS[text])
+
+    def similarity_search_by_vector(self, qvec, k):
+        return [Document(page_content="RAG retrieves passages first.",
+                         metadata={"page": 1, "bib_title": "RAG", "bib_year": 2020})]
+
+
+class FakeChain:
+    """Summary chain returning a fixed, numbered answer per call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, inputs):
+        self.calls.append(inputs["question"])
+        return SimpleNamespace(content=f"answer {len(self.calls)}")
+
+    def stream(self, inputs):
+        self.calls.append(inputs["question"])
+        for text in ("RAG ", "combines ", f"retrieval {len(self.calls)}"):
+            yield SimpleNamespace(text=text)
+
+
+@pytest.fixture
+def fake_summary(tmp_path, monkeypatch):
+    """Route summaries through fakes, with a fresh answer cache per test."""
+    chain = FakeChain()
+    settings = Settings(chroma_dir=str(tmp_path / "chroma"), llm_cache_dir=str(tmp_path / "llm_cache"))
+    version = [1]
+    monkeypatch.setattr(tools_gemini, "get_settings", lambda: settings)
+    monkeypatch.setattr(tools_gemini, "_retriever", lambda: SimpleNamespace(vectorstore=FakeVectorStore()))
+    monkeypatch.setattr(tools_gemini, "_summary_chain", lambda: chain)
+    monkeypatch.setattr(tools_gemini, "index_version", lambda chroma_dir: version[0])
+    return SimpleNamespace(chain=chain, version=version,
+                           cache=tools_gemini._semantic_cache(settings.llm_cache_dir))
+
+
+def _summarize(q):
+    return tools_gemini.summarize_with_citations.invoke({"q": q})
+
+
+def test_similar_question_hits_cache(fake_summary):
+    """Test that a paraphrase above the threshold reuses the earlier answer."""
+    assert _summarize("what is rag") == "answer 1"
+    assert _summarize("what is RAG?") == "answer 1"
+    assert fake_summary.chain.calls == ["what is rag"]
+
+
+def test_dissimilar_question_misses_cache(fake_summary):
+    """Test that a question below the threshold gets its own answer."""
+    assert _summarize("what is rag") == "answer 1"
+    assert _summarize("how are graphs stored") == "answer 2"
+    assert len(fake_summary.chain.calls) == 2
+
+
+def test_cached_answer_expires(fake_summary, monkeypatch):
+    """Test that answers older than the TTL are regenerated and purged."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(tools_gemini.time, "time", lambda: now[0])
+
+    assert _summarize("what is rag") == "answer 1"
+    now[0] += tools_gemini._SEMANTIC_CACHE_TTL + 1
+    assert _summarize("what is rag") == "answer 2"
+
+    # The expired entry was dropped when the new answer was stored
+    assert fake_summary.cache.count() == 1
+
+
+def test_index_change_invalidates_cache(fake_summary):
+    """Test that re-indexing makes earlier answers stale and purges them."""
+    assert _summarize("what is rag") == "answer 1"
+    fake_summary.version[0] = 2
+    assert _summarize("what is rag") == "answer 2"
+    assert _summarize("what is RAG?") == "answer 2"
+
+    assert fake_summary.cache.count() == 1
+
+
+def test_streamed_summary_is_cached_whole(fake_summary):
+    """Test that streaming yields chunks in order, caches the joined answer, and replays it in one piece."""
+    chunks = list(tools_gemini.summarize_with_citations_stream("what is rag"))
+    assert chunks == ["RAG ", "combines ", "retrieval 1"]
+
+    assert list(tools_gemini.summarize_with_citations_stream("what is RAG?")) == ["RAG combines retrieval 1"]
+    assert _summarize("what is rag") == "RAG combines retrieval 1"
+    assert fake_summary.chain.calls == ["what is rag"]
@@ -6,6 +6,7 @@ from pathlib import Path
 import pytest
 
 from agent.user_store_manager import UserStoreManager
+from agent.citation_formatter import CitationFormatter
 
 
 @pytest.fixture
@@ -56,6 +57,32 @@ def test_save_pdf(store_manager):
         assert f.read() == pdf_content
 
 
+def test_save_pdf_from_file_object(store_manager):
+    """Test saving a PDF streamed from a binary file object."""
+    import io
+
+    user_id = "test_user_stream"
+    pdf_path = store_manager.save_pdf(user_id, io.BytesIO(b"%PDF-1.4 streamed"), "streamed.pdf")
+
+    with open(pdf_path, "rb") as f:
+        assert f.read() == b"%PDF-1.4 streamed"
+
+
+def test_move_pdf(store_manager, tmp_path):
+    """Test moving a downloaded PDF into the user's library."""
+    user_id = "test_user_move"
+    src = tmp_path / "download.pdf"
+    src.write_bytes(b"%PDF-1.4 moved")
+
+    pdf_path = store_manager.move_pdf(user_id, str(src), "../moved paper.pdf")
+
+    assert not src.exists()
+    assert os.path.basename(pdf_path) == "moved paper.pdf"
+    assert store_manager.get_user_pdfs(user_id) == [pdf_path]
+    with open(pdf_path, "rb") as f:
+        assert f.read() == b"%PDF-1.4 moved"
+
+
 def test_get_user_pdfs(store_manager):
     """Test retrieving user PDF list."""
     user_id = "test_user_list"
@@ -72,6 +99,20 @@ def test_get_user_pdfs(store_manager):
     assert len(pdfs) == 2
 
 
+def test_get_user_pdfs_with_mtime(store_manager):
+    """Test that PDF paths come with their modification times."""
+    user_id = "test_user_mtime"
+    older = store_manager.save_pdf(user_id, b"content1", "older.pdf")
+    newer = store_manager.save_pdf(user_id, b"content2", "newer.pdf")
+    os.utime(older, (1_000_000, 1_000_000))
+
+    entries = dict(store_manager.get_user_pdfs_with_mtime(user_id))
+
+    assert set(entries) == {older, newer}
+    assert entries[older] == 1_000_000
+    assert max(entries, key=entries.get) == newer
+
+
 def test_get_user_stats(store_manager):
     """Test user statistics."""
     user_id = "test_user_stats"
@@ -124,3 +165,328 @@ def test_filename_sanitization(store_manager):
     assert "../" not in pdf_path
     assert "etc" not in pdf_path
     assert os.path.exists(pdf_path)
+
+
+def test_retriever_is_reused_until_cleared(store_manager, monkeypatch):
+    """Test that retrievers are cached per user and dropped when data is cleared."""
+    import agent.user_store_manager as usm
+
+    opened = []
+
+    class FakeChroma:
+        def __init__(self, persist_directory, embedding_function):
+            opened.append(persist_directory)
+
+        def as_retriever(self, search_kwargs):
+            return object()
+
+    monkeypatch.setattr(usm, "Chroma", FakeChroma)
+    monkeypatch.setattr(usm, "GoogleGenerativeAIEmbeddings", lambda model: None)
+
+    user_id = "test_user_retriever"
+    (store_manager._get_chroma_dir(user_id) / "chroma.sqlite3").touch()
+
+    first = store_manager.get_retriever(user_id)
+    assert store_manager.get_retriever(user_id) is first
+    assert store_manager.get_retriever(user_id, top_k=2) is not first
+    assert len(opened) == 2
+
+    store_manager.clear_user_data(user_id)
+    assert store_manager.get_retriever(user_id) is None
+
+
+class FakeEmbeddings:
+    """Deterministic stand-in for the Gemini embedding client."""
+
+    calls = []
+    texts = []
+
+    def __init__(self, model=None):
+        pass
+
+    def embed_documents(self, texts):
+        FakeEmbeddings.calls.append(len(texts))
+        FakeEmbeddings.texts.extend(texts)
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), float(text.count("a")), 1.0]
+
+
+class FakeLoader:
+    """Stand-in for PyPDFLoader: one short page per byte of the file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        from langchain_core.documents import Document
+
+        with open(self.path, "rb") as f:
+            pages = len(f.read())
+        return [Document(page_content=f"{os.path.basename(self.path)} page {i} " + "a" * i,
+                         metadata={"source": self.path, "page": i})
+                for i in range(pages)]
+
+
+@pytest.fixture
+def fake_indexing(monkeypatch):
+    """Replace PDF loading and embedding with offline fakes."""
+    import agent.user_store_manager as usm
+
+    FakeEmbeddings.calls = []
+    FakeEmbeddings.texts = []
+    monkeypatch.setattr(usm, "GoogleGenerativeAIEmbeddings", FakeEmbeddings)
+    monkeypatch.setattr(usm, "PyPDFLoader", FakeLoader)
+    monkeypatch.setattr(usm, "extract_pdf_metadata",
+                        lambda path, force_refresh=False: {"title": "Paper", "authors": [], "year": None})
+    return FakeEmbeddings.calls
+
+
+def test_build_user_index_batches_embeddings(store_manager, fake_indexing):
+    """Test that chunks are embedded in batches and readable by the retriever."""
+    user_id = "test_user_build"
+    store_manager.save_pdf(user_id, b"x" * 250, "paper.pdf")
+
+    assert store_manager.build_user_index(user_id) == 250
+    # Batches are embedded concurrently, so only the set of sizes is fixed
+    assert sorted(fake_indexing) == [50, 100, 100]
+
+    docs = store_manager.get_retriever(user_id, top_k=1).invoke("page 3 aaa")
+    assert len(docs) == 1
+    assert docs[0].metadata["bib_title"] == "Paper"
+    assert "bib_year" not in docs[0].metadata
+
+    # Chunks are embedded with the paper header, but stored without it
+    assert all(t.startswith("[Paper] paper.pdf page ") for t in FakeEmbeddings.texts)
+    assert docs[0].page_content.startswith("paper.pdf page ")
+    assert docs[0].metadata["citation_inline_ieee"] == CitationFormatter.format_inline_citation_fields(
+        [], None, page=docs[0].metadata["page"])
+
+
+def test_build_user_index_is_incremental(store_manager, fake_indexing):
+    """Test that rebuilds only embed new PDFs and drop removed ones."""
+    user_id = "test_user_incremental"
+    first = store_manager.save_pdf(user_id, b"x" * 3, "first.pdf")
+    assert store_manager.build_user_index(user_id) == 3
+
+    # Nothing changed: nothing is embedded again
+    fake_indexing.clear()
+    assert store_manager.build_user_index(user_id) == 3
+    assert fake_indexing == []
+
+    # A new upload only embeds its own chunks
+    store_manager.save_pdf(user_id, b"x" * 2, "second.pdf")
+    assert store_manager.build_user_index(user_id) == 5
+    assert fake_indexing == [2]
+
+    # Removed PDFs disappear from the index
+    os.remove(first)
+    fake_indexing.clear()
+    assert store_manager.build_user_index(user_id) == 2
+    assert fake_indexing == []
+
+    # A re-uploaded PDF keeps unchanged chunks and drops the rest
+    store_manager.save_pdf(user_id, b"x", "second.pdf")
+    assert store_manager.build_user_index(user_id) == 1
+    assert fake_indexing == []
+
+    # force re-embeds everything that is left
+    assert store_manager.build_user_index(user_id, force=True) == 1
+    assert fake_indexing == [1]
+
+
+def test_build_user_index_refreshes_changed_metadata(store_manager, fake_indexing, monkeypatch):
+    """Test that a revision with the same text but new metadata is re-embedded."""
+    import agent.user_store_manager as usm
+
+    user_id = "test_user_metadata"
+    store_manager.save_pdf(user_id, b"x" * 2, "paper.pdf")
+    assert store_manager.build_user_index(user_id) == 2
+
+    monkeypatch.setattr(usm, "extract_pdf_metadata",
+                        lambda path, force_refresh=False: {"title": "Paper v2", "authors": ["Jane Doe"], "year": 2021})
+    fake_indexing.clear()
+    FakeEmbeddings.texts.clear()
+    store_manager.save_pdf(user_id, b"y" * 2, "paper.pdf")
+    assert store_manager.build_user_index(user_id) == 2
+    assert fake_indexing == [2]
+    assert all(t.startswith("[Paper v2 — Jane Doe (2021)] ") for t in FakeEmbeddings.texts)
+
+    docs = store_manager.get_retriever(user_id, top_k=2).invoke("page 1 a")
+    assert {d.metadata["bib_title"] for d in docs} == {"Paper v2"}
+    assert all(d.metadata["bib_year"] == 2021 for d in docs)
+
+
+def test_forced_rebuild_refreshes_metadata(store_manager, fake_indexing, monkeypatch):
+    """Test that force=True re-extracts metadata instead of using the metadata cache."""
+    import agent.user_store_manager as usm
+
+    refreshes = []
+
+    def fake_extract(path, force_refresh=False):
+        refreshes.append(force_refresh)
+        return {"title": "Paper", "authors": [], "year": None}
+
+    monkeypatch.setattr(usm, "extract_pdf_metadata", fake_extract)
+    user_id = "test_user_force"
+    store_manager.save_pdf(user_id, b"x" * 2, "paper.pdf")
+
+    store_manager.build_user_index(user_id)
+    store_manager.build_user_index(user_id, force=True)
+    assert refreshes == [False, True]
+
+
+def test_concurrent_builds_for_one_user_do_not_overlap(store_manager, fake_indexing, monkeypatch):
+    """Test that simultaneous builds for a user embed each new PDF only once."""
+    import threading
+    import time
+    import agent.user_store_manager as usm
+
+    real_load = usm._load_pdf
+
+    def slow_load(*args):
+        time.sleep(0.2)
+        return real_load(*args)
+
+    monkeypatch.setattr(usm, "_load_pdf", slow_load)
+    user_id = "test_user_concurrent"
+    store_manager.save_pdf(user_id, b"x" * 3, "paper.pdf")
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store_manager.build_user_index(user_id)))
+               for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [3, 3]
+    assert fake_indexing == [3]
+
+
+def test_build_user_index_loads_pdfs_in_parallel(store_manager, fake_indexing, monkeypatch):
+    """Test that several changed PDFs are loaded through forkserver worker processes."""
+    import multiprocessing
+    import agent.user_store_manager as usm
+
+    # Record the requested start method, but fork here so the workers
+    # inherit this test's fakes
+    start_methods = []
+    real_executor = usm.ProcessPoolExecutor
+
+    def spy_executor(*args, mp_context=None, **kwargs):
+        start_methods.append(mp_context.get_start_method())
+        return real_executor(*args, mp_context=multiprocessing.get_context("fork"), **kwargs)
+
+    monkeypatch.setattr(usm, "ProcessPoolExecutor", spy_executor)
+    monkeypatch.setattr(usm.os, "cpu_count", lambda: 4)
+    user_id = "test_user_parallel"
+    for i in range(1, 4):
+        store_manager.save_pdf(user_id, b"x" * i, f"paper{i}.pdf")
+
+    assert store_manager.build_user_index(user_id) == 6
+    assert sorted(fake_indexing) == [1, 2, 3]
+    assert start_methods == ["forkserver"]
+
+
+def test_user_stats_follow_pdf_changes(store_manager):
+    """Test that cached stats are refreshed when PDFs are added, replaced or removed."""
+    user_id = "test_user_stats_cache"
+
+    first = store_manager.save_pdf(user_id, b"1234", "a.pdf")
+    assert store_manager.get_user_stats(user_id)["total_size"] == 4
+
+    # Replacing a file keeps the directory mtime, but not the size
+    store_manager.save_pdf(user_id, b"12345678", "a.pdf")
+    assert store_manager.get_user_stats(user_id)["total_size"] == 8
+
+    store_manager.save_pdf(user_id, b"12", "b.pdf")
+    stats = store_manager.get_user_stats(user_id)
+    assert stats["pdf_count"] == 2
+    assert sorted(stats["pdf_names"]) == ["a.pdf", "b.pdf"]
+
+    os.remove(first)
+    stats = store_manager.get_user_stats(user_id)
+    assert stats["pdf_names"] == ["b.pdf"]
+    assert stats["total_size"] == 2
+
+
+def test_find_user_pdf(store_manager):
+    """Test finding a PDF by exact or partial file name, ignoring case."""
+    user_id = "test_user_find"
+
+    assert store_manager.find_user_pdf(user_id, "paper") is None
+
+    survey = store_manager.save_pdf(user_id, b"1", "Survey of RAG.pdf")
+    rag = store_manager.save_pdf(user_id, b"2", "rag.pdf")
+
+    assert store_manager.find_user_pdf(user_id, "RAG.PDF") == rag
+    assert store_manager.find_user_pdf(user_id, "rag") == rag
+    assert store_manager.find_user_pdf(user_id, "survey") == survey
+    assert store_manager.find_user_pdf(user_id, "missing") is None
+
+    # New uploads are visible immediately
+    new = store_manager.save_pdf(user_id, b"3", "new.pdf")
+    assert store_manager.find_user_pdf(user_id, "new") == new
+
+
+def test_pdf_list_text_is_clamped(store_manager):
+    """Test that the rendered PDF list stays within one Discord message."""
+    user_id = "test_user_list_text"
+
+    assert store_manager.get_user_stats(user_id)["pdf_list_text"] == ""
+
+    store_manager.save_pdf(user_id, b"1", "a.pdf")
+    assert store_manager.get_user_stats(user_id)["pdf_list_text"] == "  • a.pdf"
+
+    for i in range(60):
+        store_manager.save_pdf(user_id, b"1", f"{'long_name_' * 4}{i:02d}.pdf")
+    text = store_manager.get_user_stats(user_id)["pdf_list_text"]
+
+    assert len(text) < 1600
+    shown = text.count("•")
+    assert text.endswith(f"… and {61 - shown} more")
+
+
+def test_cached_answer_for_similar_question(store_manager, fake_indexing, monkeypatch):
+    """Test that answers are reused for near-identical questions until the index changes."""
+    user_id = "test_user_answers"
+
+    answer, remember = store_manager.get_cached_answer(user_id, "what is rag")
+    assert answer is None
+    remember("RAG combines retrieval and generation.")
+
+    # Same embedding (FakeEmbeddings only looks at length and "a" count)
+    answer, _ = store_manager.get_cached_answer(user_id, "what is gar")
+    assert answer == "RAG combines retrieval and generation."
+
+    # A clearly different question misses
+    answer, _ = store_manager.get_cached_answer(user_id, "a" * 40)
+    assert answer is None
+
+    # Re-indexing makes earlier answers stale
+    monkeypatch.setattr(store_manager, "index_version", lambda uid: 1)
+    answer, _ = store_manager.get_cached_answer(user_id, "what is rag")
+    assert answer is None
+
+    store_manager.clear_user_data(user_id)
+    assert user_id not in store_manager._answer_cache
+
+
+def test_query_embeddings_are_memoized(store_manager, fake_indexing, monkeypatch):
+    """Test that repeated query texts are embedded once while documents pass through."""
+    queries = []
+    client = store_manager.embeddings.client
+    original = client.embed_query
+    monkeypatch.setattr(client, "embed_query", lambda text: queries.append(text) or original(text))
+
+    first = store_manager.embeddings.embed_query("what is rag")
+    second = store_manager.embeddings.embed_query("what is rag")
+    store_manager.embeddings.embed_query("what is bm25")
+
+    assert first == second
+    assert queries == ["what is rag", "what is bm25"]
+
+    store_manager.embeddings.embed_documents(["what is rag"])
+    assert fake_indexing == [1]